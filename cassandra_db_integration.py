@@ -1,21 +1,31 @@
 """A Cassandra integration for the py-wordle game."""
 import json
-from collections import Counter
+from collections import Counter, deque
 from timeit import default_timer as timer
 
 from cassandra.cluster import Cluster
 from cassandra.query import dict_factory
-from wordle_game import WordleGame, get_words, position_level_score, word_level_score
+from results_store import ResultsStore
+from wordle_core import (
+    get_words,
+    position_level_score,
+    simulate_batch,
+    word_level_score,
+)
 
-
-def _insert_helper(values):
-    r = ""
-    for v in values:
-        if isinstance(v, (bool, int)):
-            r += "," + str(v)
-        else:
-            r += ",'" + v + "'"
-    return r[1:]
+# The per-method summary kept by Cassandra.insert_results, keyed by method
+# (the name of the table holding that method's results). It is one row
+# of plain columns written with a single INSERT, so writing the same
+# results again gives the same row. (Counter columns can't be reset
+# reliably once deleted.)
+SUMMARY_TABLE = "method_report"
+SUMMARY_FIELDS = {
+    "method": "text",
+    "games": "int",
+    "score_sum": "int",
+    "score_counts": "map<int, int>",
+    "failed": "set<text>",
+}
 
 
 class Cassandra:
@@ -25,7 +35,21 @@ class Cassandra:
     session = None
     schema = None
 
-    def __init__(self):
+    def __init__(self, session=None, verbose=True, concurrency=100):
+        """Connect to the local cluster and use the wordle keyspace. An
+        existing session (or a stand-in object with the same execute,
+        execute_async and prepare methods) can be passed instead.
+
+        verbose controls whether CQL commands are printed, and
+        concurrency is the maximum number of in-flight writes used by
+        insert_many.
+        """
+        self.verbose = verbose
+        self.concurrency = concurrency
+        self.prepared = {}
+        if session is not None:
+            self.session = session
+            return
         self.cluster = Cluster()
         self.session = self.cluster.connect()
         self.session.row_factory = dict_factory
@@ -35,13 +59,18 @@ class Cassandra:
 
         self.session.set_keyspace("wordle")
 
+    def log(self, command):
+        """Print the command if verbose output is on."""
+        if self.verbose:
+            print(command)
+
     def create_keyspace(self, name):
         """Create a Cassandra keyspace. This is simillar to a collection
         in Mongo.
         """
         command = f"CREATE KEYSPACE IF NOT EXISTS {name} WITH REPLICATION"
         command += " = { 'class' : 'SimpleStrategy', 'replication_factor' : 3 }"
-        print(command)
+        self.log(command)
         self.session.execute(command)
 
     def create_table(self, table, fields, primary="solution"):
@@ -52,23 +81,96 @@ class Cassandra:
         command = (
             f"CREATE TABLE IF NOT EXISTS {table} ({key_list}PRIMARY KEY ({primary}))"
         )
-        print(command)
+        self.log(command)
         self.session.execute(command)
 
+    def prepare(self, command):
+        """Return a prepared statement for the command, preparing it only
+        once.
+        """
+        if command not in self.prepared:
+            self.log(command)
+            self.prepared[command] = self.session.prepare(command)
+        return self.prepared[command]
+
+    def prepare_insert(self, table, keys):
+        """Return a prepared INSERT statement for the table and columns.
+        Statements are prepared once and reused.
+        """
+        markers = ", ".join("?" for _ in keys)
+        return self.prepare(
+            f"INSERT INTO {table} ({', '.join(keys)}) VALUES ({markers})"
+        )
+
     def insert(self, table, data):
         """Insert into the specified table."""
-        keys = ", ".join(data.keys())
-        # values = ", ".join([f"'{v}'" for v in data.values()])
-        values = _insert_helper(data.values())
-        command = f"INSERT INTO {table} ({keys}) VALUES ({values})"
-        print(command)
-        self.session.execute(command)
+        statement = self.prepare_insert(table, data.keys())
+        self.session.execute(statement, tuple(data.values()))
+
+    def execute_many(self, statement, parameters, concurrency=None):
+        """Execute a prepared statement once per parameter tuple, with
+        at most concurrency requests in flight at once.
+        """
+        limit = concurrency or self.concurrency
+        in_flight = deque()
+        for p in parameters:
+            if len(in_flight) >= limit:
+                in_flight.popleft().result()
+            in_flight.append(self.session.execute_async(statement, p))
+        while in_flight:
+            in_flight.popleft().result()
+
+    def insert_many(self, table, rows, concurrency=None):
+        """Insert a list of dictionaries with the same keys into the
+        table, with at most concurrency writes in flight at once.
+        Returns the number of rows written per second.
+        """
+        if not rows:
+            return 0.0
+        statement = self.prepare_insert(table, rows[0].keys())
+        start = timer()
+        self.execute_many(statement, [tuple(r.values()) for r in rows], concurrency)
+        elapsed = timer() - start
+        rate = len(rows) / elapsed if elapsed > 0 else float("inf")
+        self.log(f"Inserted {len(rows)} rows into {table} ({rate:.0f} rows/sec)")
+        return rate
+
+    def create_summary_tables(self):
+        """Create the per-method summary table used by the reports."""
+        self.create_table(SUMMARY_TABLE, SUMMARY_FIELDS, "method")
+
+    def insert_results(self, table, rows):
+        """Insert puzzle result rows into the method's table and write
+        the method's summary row, with the number of games and scores of
+        the solved puzzles and the failed solutions. Returns the number
+        of rows written per second.
+
+        rows must be all of the method's results. The summary row is
+        replaced, not added to, so re-running a method is safe.
+        """
+        rate = self.insert_many(table, rows)
+        solved = [r for r in rows if r["solved"]]
+        statement = self.prepare_insert(SUMMARY_TABLE, SUMMARY_FIELDS.keys())
+        summary = (
+            table,
+            len(solved),
+            sum(r["score"] for r in solved),
+            dict(Counter(r["score"] for r in solved)),
+            {r["solution"] for r in rows if not r["solved"]},
+        )
+        self.session.execute(statement, summary)
+        return rate
+
+    def clear_summary(self, table):
+        """Remove a method's row from the summary table."""
+        command = f"DELETE FROM {SUMMARY_TABLE} WHERE method = ?"
+        self.session.execute(self.prepare(command), (table,))
 
     def select(self, table, columns):
         """Select data from the specified table."""
         keys = ", ".join(columns)
         command = f"SELECT {keys} FROM {table}"
-        print(command)
+        self.log(command)
         return list(self.session.execute(command))
 
     def list_keyspaces(self):
@@ -86,7 +188,7 @@ class Cassandra:
     def drop_table(self, table):
         """Drop the specified table."""
         command = f"DROP TABLE IF EXISTS {table};"
-        print(command)
+        self.log(command)
         self.session.execute(command)
 
 
@@ -98,34 +200,33 @@ def evaluate_solution_methods(db, *args):
 
     Blacklist includes puzzles that generated exceptions. This means the
     scoring algorithm has bugs and sometimes fails.
+
+    The puzzles are solved together with simulate_batch, which scores
+    each distinct solver state once.
     """
     for method in [*args]:
         print(method)
         all_solutions = get_words("wordlist_solutions.txt")
-        blacklist = []
         unsolved = []
         num_guesses = []
+        documents = []
         start = timer()
-        for w in all_solutions:
-            try:
-                game = WordleGame(enable_solver=True, solution=w)
-                result, solved = game.solve(method=method)
-                if not solved:
-                    unsolved.append(w)
-                else:
-                    num_guesses.append(len(result))
-                document = {
-                    "solution": w,
-                    # "method": method.__name__,
-                    # "guesses": result,
-                    "score": len(result),
-                    "solved": solved,
-                }
-                db.insert(method.__name__, document)
-            except Exception as e:
-                print(e)
-                blacklist.append(w)
+        traces, blacklist = simulate_batch(all_solutions, method=method)
+        for w, (result, solved) in traces.items():
+            if not solved:
+                unsolved.append(w)
+            else:
+                num_guesses.append(len(result))
+            document = {
+                "solution": w,
+                # "method": method.__name__,
+                # "guesses": result,
+                "score": len(result),
+                "solved": solved,
+            }
+            documents.append(document)
         end = timer()
+        rate = db.insert_results(method.__name__, documents)
         print(
             json.dumps(
                 {
@@ -136,36 +237,95 @@ def evaluate_solution_methods(db, *args):
                     "unsolved count": len(unsolved),
                     "average score": sum(num_guesses) / len(num_guesses),
                     "elapsed time": end - start,
+                    "rows/sec": rate,
                 },
                 indent=4,
             )
         )
 
 
+def summary_row(db, table, columns):
+    """Return the columns of the method's summary row, or None if the
+    method has no results.
+    """
+    query = f"SELECT {', '.join(columns)} FROM {SUMMARY_TABLE} WHERE method = %s;"
+    return db.session.execute(query, (table,)).one()
+
+
+def average_score(db, table):
+    """Return the average score of the method's solved puzzles, or None
+    if it has none.
+    """
+    row = summary_row(db, table, ["games", "score_sum"])
+    if row is None or not row["games"]:
+        return None
+    return row["score_sum"] / row["games"]
+
+
+def score_distribution(db, table):
+    """Return a score -> count dict for the method's solved puzzles."""
+    row = summary_row(db, table, ["score_counts"])
+    if row is None or not row["score_counts"]:
+        return {}
+    return dict(sorted(row["score_counts"].items()))
+
+
+def failed_solutions(db, table):
+    """Return the solutions the method failed to solve."""
+    row = summary_row(db, table, ["failed"])
+    if row is None or not row["failed"]:
+        return []
+    return sorted(row["failed"])
+
+
+class CassandraStore(ResultsStore):
+    """A results store with one Cassandra table per scoring method plus
+    the shared summary table.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def insert_results(self, method, rows):
+        """Write the rows to the method's table and its summary row."""
+        rows = [
+            {"solution": r["solution"], "score": r["score"], "solved": r["solved"]}
+            for r in rows
+        ]
+        self.db.insert_results(method, rows)
+
+    def average_score(self, method):
+        """Return the average score from the summary row."""
+        return average_score(self.db, method)
+
+    def score_distribution(self, method):
+        """Return the score distribution from the summary row."""
+        return score_distribution(self.db, method)
+
+    def failed_solutions(self, method):
+        """Return the failed solutions from the summary row."""
+        return failed_solutions(self.db, method)
+
+    def close(self):
+        """Shut down the cluster connection, if the store opened one."""
+        if self.db.cluster is not None:
+            self.db.cluster.shutdown()
+
+
 def print_average_score(db, table):
     """Print the average score for the provided method."""
-    db.session.execute(f"CREATE INDEX IF NOT EXISTS ON {table}(method);")
-    # query = f"SELECT AVG(score) FROM {table};"
-    query = f"SELECT score FROM {table};"
-    avg = [i["score"] for i in list(db.session.execute(query))]
-    avg = sum(avg) / len(avg)
-    print(f"   Average  : {avg}")
+    print(f"   Average  : {average_score(db, table)}")
 
 
 def print_score_distribution(db, table):
     """Print the distribution of scores for the provided method."""
-    db.session.execute(f"CREATE INDEX IF NOT EXISTS ON {table}(method);")
-    query = f"SELECT score FROM {table};"
-    avg = [i["score"] for i in list(db.session.execute(query))]
-    for k, v in sorted(dict(Counter(avg)).items()):
+    for k, v in score_distribution(db, table).items():
         print(f"   {k} guesses: {v}")
 
 
 def print_failed_solutions(db, table):
     """Print the number of unsolved puzzles and the target solution."""
-    db.session.execute(f"CREATE INDEX IF NOT EXISTS ON {table}(solved);")
-    query = f"SELECT solution FROM {table} WHERE solved = false ALLOW FILTERING;"
-    words = [i["solution"] for i in list(db.session.execute(query))]
+    words = failed_solutions(db, table)
     print(f"Failed to solve {len(words)} puzzles:")
     print(words)
 
@@ -179,12 +339,14 @@ if __name__ == "__main__":
         "score": "int",
         "solved": "boolean",
     }
-    cassandra_db = Cassandra()
+    cassandra_db = Cassandra(verbose=False)
+    cassandra_db.create_summary_tables()
     # cassandra_db.list_tables()
 
     for m in (word_level_score, position_level_score):
         m_name = m.__name__
         # cassandra_db.drop_table(m_name)
+        # cassandra_db.clear_summary(m_name)
         # cassandra_db.create_table(m_name, schema)
         # evaluate_solution_methods(cassandra_db, m)
         print("\n", "-" * 10, f"{m_name}", "-" * 10)
@@ -0,0 +1,98 @@
+"""A guess and its feedback compiled into a single constraint.
+
+Applying the coloured letters of a wordscore one at a time loses the
+information that repeated letters carry: a green 'e' and a grey 'e' in
+the same guess mean the solution has exactly one 'e'. A Constraint
+keeps the green letters, the letters excluded from each position and
+the minimum and maximum count of each letter, so filtering with it
+leaves exactly the words that would give the same feedback.
+"""
+import numpy as np
+
+
+class Constraint:
+    """The constraint a wordscore puts on the solution.
+
+    greens[i] is the letter known to be at position i (0-based) or
+    None, excluded[i] the set of letters known not to be there, and
+    min_counts / max_counts the bounds on how often each letter
+    appears. max_counts only has entries for letters marked grey.
+    """
+
+    def __init__(self, wordscore):
+        self.greens = [None] * 5
+        self.excluded = [set() for _ in range(5)]
+        self.min_counts = {}
+        self.max_counts = {}
+        for i, (char, val) in enumerate(wordscore):
+            if val == 2:
+                self.greens[i] = char
+            else:
+                self.excluded[i].add(char)
+            if val:
+                self.min_counts[char] = self.min_counts.get(char, 0) + 1
+            else:
+                self.max_counts[char] = 0
+        for char in self.max_counts:
+            self.max_counts[char] = self.min_counts.get(char, 0)
+
+    @classmethod
+    def revealed(cls, wordscore):
+        """Return the hard mode constraint a wordscore puts on later
+        guesses: green letters must stay in place and yellow letters
+        must be used again. Grey letters may still be guessed.
+        """
+        constraint = cls(wordscore)
+        constraint.excluded = [set() for _ in range(5)]
+        constraint.max_counts = {}
+        return constraint
+
+    def matches(self, word):
+        """Return True if the word satisfies the constraint."""
+        for i, char in enumerate(word):
+            if char in self.excluded[i]:
+                return False
+            if self.greens[i] is not None and self.greens[i] != char:
+                return False
+        for char, n in self.min_counts.items():
+            if word.count(char) < n:
+                return False
+        for char, n in self.max_counts.items():
+            if word.count(char) > n:
+                return False
+        return True
+
+    def apply(self, index, bits):
+        """Return the words in a WordIndex bitset that satisfy the
+        constraint.
+        """
+        for i, char in enumerate(self.greens):
+            if char is not None:
+                bits &= index.position_bits[i][char]
+        for i, chars in enumerate(self.excluded):
+            for char in chars:
+                bits &= ~index.position_bits[i][char]
+        for char, n in self.min_counts.items():
+            bits &= index.count_bits[char][n]
+        for char, n in self.max_counts.items():
+            if n < 5:
+                bits &= ~index.count_bits[char][n + 1]
+        return bits
+
+    def mask(self, letters):
+        """Return a boolean array of which rows of an N x 5 array of
+        letter numbers (a=0) satisfy the constraint.
+        """
+        keep = np.ones(len(letters), dtype=bool)
+        for i, char in enumerate(self.greens):
+            if char is not None:
+                keep &= letters[:, i] == ord(char) - ord("a")
+        for i, chars in enumerate(self.excluded):
+            for char in chars:
+                keep &= letters[:, i] != ord(char) - ord("a")
+        for char in self.min_counts.keys() | self.max_counts.keys():
+            count = (letters == ord(char) - ord("a")).sum(axis=1)
+            keep &= count >= self.min_counts.get(char, 0)
+            if char in self.max_counts:
+                keep &= count <= self.max_counts[char]
+        return keep
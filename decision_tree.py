@@ -0,0 +1,178 @@
+"""Precompiled solver decision trees.
+
+For a fixed scoring method and first guess the solver is deterministic,
+so its whole policy can be worked out ahead of time: every feedback
+path the game can take maps to the next guess. The tree is stored as
+JSON, keyed by the path of guesses and patterns so far, e.g.
+
+    ""                      -> "later"
+    "later:21011"           -> "alter"
+    "later:21011/alter:..." -> ...
+
+Once loaded, WordleGame.suggest_word answers with a dictionary lookup.
+The tree records a hash of the word lists it was built from, and a tree
+built from other word lists is refused.
+"""
+import json
+from collections import defaultdict
+
+from patterns import (
+    SOLVED,
+    decode_pattern,
+    get_pattern_matrix,
+    pattern_to_string,
+    wordlist_hash,
+)
+from word_index import get_word_index
+from wordle_core import WordleGame, word_level_score
+
+
+def path_key(guesses_made):
+    """Return the tree key for a list of wordscores, e.g.
+    [[['l', 2], ['a', 1], ...], ...] -> 'later:21011/...'.
+    """
+    return "/".join(
+        "".join(c for c, _ in wordscore) + ":" + "".join(str(v) for _, v in wordscore)
+        for wordscore in guesses_made
+    )
+
+
+def game_wordlist_hash():
+    """Return the wordlist_hash of WordleGame's guess and solution
+    lists.
+    """
+    return wordlist_hash(WordleGame.valid_guesses, WordleGame.possible_solutions)
+
+
+def build_decision_tree(method=word_level_score, first_guess="later", max_guesses=6):
+    """Return the decision tree followed by WordleGame.solve for the
+    given method and first guess.
+
+    Each node holds the solver's candidate bitset and the solutions
+    whose games reach it. The solutions are split by the pattern they
+    give for the node's guess and the candidates are reduced the same
+    way WordleGame.evaluate_guess does, so every path matches a game.
+    """
+    index = get_word_index(WordleGame.solution_file)
+    patterns = get_pattern_matrix()
+    tree = {}
+    stack = [("", index.all, index.words, 1)]
+    while stack:
+        path, candidates, solutions, turn = stack.pop()
+        if turn == 1 and first_guess is not None:
+            guess = first_guess
+        else:
+            try:
+                guess = next(iter(method(index.words_in(candidates))))
+            except ZeroDivisionError:
+                continue
+        tree[path] = guess
+        if turn == max_guesses:
+            continue
+        branches = defaultdict(list)
+        for solution in solutions:
+            branches[patterns.pattern(guess, solution)].append(solution)
+        for code, group in branches.items():
+            if code == SOLVED:
+                continue
+            result = [[c, v] for c, v in zip(guess, decode_pattern(code))]
+            key = f"{guess}:{pattern_to_string(code)}"
+            child_path = f"{path}/{key}" if path else key
+            child = index.reduce(result, candidates)
+            stack.append((child_path, child, group, turn + 1))
+    return {
+        "method": method.__name__,
+        "first_guess": first_guess,
+        "wordlists": game_wordlist_hash(),
+        "tree": dict(sorted(tree.items())),
+    }
+
+
+def save_decision_tree(tree, filename=None):
+    """Save a tree to a JSON file and return the filename."""
+    if filename is None:
+        filename = f"decision_tree_{tree['method']}_{tree['first_guess']}.json"
+    with open(filename, "w") as fileout:
+        json.dump(tree, fileout, separators=(",", ":"))
+    return filename
+
+
+class DecisionTree:
+    """A loaded decision tree that answers suggestions by lookup."""
+
+    def __init__(self, tree):
+        self.method = tree["method"]
+        self.first_guess = tree["first_guess"]
+        self.wordlists = tree.get("wordlists")
+        self.tree = tree["tree"]
+
+    @classmethod
+    def load(cls, filename):
+        """Load a tree saved with save_decision_tree."""
+        with open(filename) as file:
+            return cls(json.load(file))
+
+    def next_guess(self, guesses_made):
+        """Return the next guess for the game so far, or None if the
+        game has left the tree.
+        """
+        return self.tree.get(path_key(guesses_made))
+
+    def walk(self, solution, max_guesses=6):
+        """Play a game against the solution by following the tree.
+        Returns the guesses made and whether the puzzle was solved.
+        """
+        patterns = get_pattern_matrix()
+        path = ""
+        guesses = []
+        while len(guesses) < max_guesses:
+            guess = self.tree.get(path)
+            if guess is None:
+                break
+            guesses.append(guess)
+            if guess == solution:
+                return guesses, True
+            key = f"{guess}:{pattern_to_string(patterns.pattern(guess, solution))}"
+            path = f"{path}/{key}" if path else key
+        return guesses, False
+
+
+def use_decision_tree(filename):
+    """Load a tree and make WordleGame.suggest_word use it. A tree built
+    from other word lists than WordleGame's (or saved before trees
+    recorded them) raises a ValueError.
+    """
+    tree = DecisionTree.load(filename)
+    if tree.wordlists != game_wordlist_hash():
+        raise ValueError(
+            f"{filename} was built from other word lists. "
+            "Rebuild it with build_decision_tree."
+        )
+    WordleGame.decision_tree = tree
+    return tree
+
+
+def run_tree_benchmarks(tree):
+    """Solve all possible puzzles by walking the tree and print the same
+    statistics as run_solver_benchmarks.
+    """
+    from timeit import default_timer as timer
+
+    start = timer()
+    unsolved = []
+    num_guesses = []
+    for w in get_word_index(WordleGame.solution_file).words:
+        guesses, solved = tree.walk(w)
+        if solved:
+            num_guesses.append(len(guesses))
+        else:
+            unsolved.append(w)
+    end = timer()
+    print(f"Unsolved {len(unsolved)}: {unsolved}")
+    print(f"Average score: {sum(num_guesses)/len(num_guesses)}")
+    print(f"Elapsed time: {end - start}")
+
+
+if __name__ == "__main__":
+    save_decision_tree(build_decision_tree(word_level_score, "later"))
+    run_tree_benchmarks(DecisionTree.load("decision_tree_word_level_score_later.json"))
@@ -0,0 +1,95 @@
+"""Inverse search: from a shared grid of coloured squares to solutions.
+
+Given the rows of feedback someone shared, e.g.
+
+    [[0, 2, 2, 2, 2],
+     [0, 2, 2, 2, 2],
+     [2, 2, 2, 2, 2]]
+
+the possible solutions are the ones for which every row is the
+feedback of at least one valid guess. A row shared k times needs k
+different guesses giving it. The InverseIndex is built from
+the pattern matrix and maps each (solution, pattern) pair to the
+guesses that produce it, so a grid is answered with one lookup per row.
+"""
+from collections import Counter
+
+import numpy as np
+
+from patterns import NUM_PATTERNS, encode_values, get_pattern_matrix
+
+
+class InverseIndex:
+    """An inverted index from (solution, pattern) to guesses.
+
+    For solution s, the IDs of the guesses giving pattern p are
+    guess_ids[s, starts[s, p]:starts[s, p + 1]].
+    """
+
+    def __init__(self, patterns=None, guesses=None, chunk_size=256):
+        if patterns is None:
+            patterns = get_pattern_matrix()
+        self.solutions = patterns.solutions
+        if guesses is None:
+            self.guesses = patterns.guesses
+            matrix = patterns.matrix
+        else:
+            self.guesses = list(guesses)
+            matrix = patterns.codes(self.guesses, patterns.solutions)
+        self.solution_index = patterns.solution_index
+
+        num_solutions = len(self.solutions)
+        id_type = np.int16 if len(self.guesses) < 2**15 else np.int32
+        self.guess_ids = np.empty((num_solutions, len(self.guesses)), dtype=id_type)
+        self.counts = np.empty((num_solutions, NUM_PATTERNS), dtype=np.int32)
+        for start in range(0, num_solutions, chunk_size):
+            codes = np.ascontiguousarray(matrix[:, start : start + chunk_size].T)
+            rows = slice(start, start + codes.shape[0])
+            self.guess_ids[rows] = np.argsort(codes, axis=1, kind="stable")
+            for i, row in enumerate(codes):
+                self.counts[start + i] = np.bincount(row, minlength=NUM_PATTERNS)
+        self.starts = np.zeros((num_solutions, NUM_PATTERNS + 1), dtype=np.int32)
+        np.cumsum(self.counts, axis=1, out=self.starts[:, 1:])
+
+    def possible(self, code, times=1):
+        """Return a boolean array of the solutions for which at least
+        times different guesses give the pattern code.
+        """
+        return self.counts[:, code] >= times
+
+    def guesses_for(self, solution, code):
+        """Return the guesses that give the pattern code for the
+        solution.
+        """
+        s = self.solution_index[solution]
+        ids = self.guess_ids[s, self.starts[s, code] : self.starts[s, code + 1]]
+        return [self.guesses[i] for i in ids]
+
+    def search(self, grid, with_guesses=False):
+        """Return the solutions consistent with every row of the grid.
+
+        Each row is a list of five 0/1/2 values. With with_guesses=True
+        a dict is returned instead, mapping each solution to a list of
+        the guesses that could have produced each row.
+        """
+        codes = [encode_values(row) for row in grid]
+        mask = np.ones(len(self.solutions), dtype=bool)
+        for code, times in Counter(codes).items():
+            mask &= self.possible(code, times)
+        solutions = [self.solutions[i] for i in np.flatnonzero(mask)]
+        if not with_guesses:
+            return solutions
+        return {s: [self.guesses_for(s, code) for code in codes] for s in solutions}
+
+
+_indexes = {}
+
+
+def get_inverse_index(guesses=None):
+    """Return the InverseIndex over the full guess list, or over the
+    guess words given, building it only once per process.
+    """
+    key = None if guesses is None else tuple(guesses)
+    if key not in _indexes:
+        _indexes[key] = InverseIndex(guesses=guesses)
+    return _indexes[key]
@@ -0,0 +1,197 @@
+"""A depth-limited lookahead solver that minimises expected guesses.
+
+The greedy scoring methods only look at the next guess. lookahead_score
+searches a few guesses ahead and picks the guess with the lowest
+expected number of guesses to finish, assuming each remaining candidate
+is equally likely to be the solution.
+
+With n candidates left, no strategy can average fewer than 2 - 1/n
+guesses: at best the next guess is right 1 time in n and the one after
+always is. That bound is used below the depth limit and to prune
+guesses. A guess that splits n candidates into groups of n_b can't do
+better than 1 + sum(n_b / n * (2 - 1 / n_b)) over the unsolved groups,
+so guesses are tried best bound first and the search stops once the
+bound can't beat the best guess found. Values of candidate sets already
+searched are kept in a transposition table keyed by the sorted IDs of
+the candidates, the depth and the width.
+
+Given a deadline, the search gives up on a guess once the deadline
+passes and returns the guesses it finished, so anytime_search can stop
+on time.
+"""
+from timeit import default_timer as timer
+
+import numpy as np
+
+from opener_search import distinct_patterns
+from patterns import SOLVED, get_pattern_matrix
+from word_index import CandidateState, get_word_index
+from word_table import top_indices
+from wordle_core import WordleGame, run_batch_benchmarks
+
+
+def lower_bound(n):
+    """Return the fewest expected guesses to solve n candidates."""
+    return 2 - 1 / n
+
+
+class OutOfTime(Exception):
+    """Raised when a search passes its deadline."""
+
+
+class Lookahead:
+    """The search state shared by lookahead_score calls: the pattern
+    codes in solution-major order and the transposition table.
+    """
+
+    def __init__(self, max_entries=1_000_000):
+        patterns = get_pattern_matrix()
+        self.index = get_word_index(WordleGame.solution_file)
+        self.guesses = patterns.guesses
+        self.guess_index = patterns.guess_index
+        self.by_solution = patterns.solution_major()
+        self.solution_rows = np.array(
+            [patterns.guess_index[w] for w in self.index.words], dtype=np.intp
+        )
+        self.max_entries = max_entries
+        self.table = {}
+
+    def bounds(self, ids, rows=None):
+        """Return the bound on the expected guesses to solve the
+        candidate IDs for each guess (or for the given guess rows).
+        """
+        n = len(ids)
+        codes = (
+            self.by_solution[ids] if rows is None else self.by_solution[ids][:, rows]
+        )
+        # A guess in the candidates can also solve the game right away.
+        splits = distinct_patterns(codes)
+        member = np.zeros(self.by_solution.shape[1], dtype=np.int64)
+        member[self.solution_rows[ids]] = 1
+        if rows is not None:
+            member = member[rows]
+        # 1 + sum over unsolved groups of (2 n_b - 1) / n.
+        return 1 + (2 * n - member - splits) / n
+
+    def ranked_guesses(self, ids, width):
+        """Return the width guesses (as matrix rows) with the best bound
+        for the candidate IDs, best first, and the bound of each guess.
+        """
+        bounds = self.bounds(ids)
+        order = top_indices(-bounds, width)
+        return order, bounds[order]
+
+    def expected(self, ids, row, depth, width, deadline=None):
+        """Return the expected guesses to solve the candidate IDs when
+        the guess in matrix row is next. Raises OutOfTime if the
+        deadline (a timeit.default_timer time) passes first.
+        """
+        codes = self.by_solution[ids, row]
+        total = 0.0
+        for code in np.unique(codes).tolist():
+            if code == SOLVED:
+                continue
+            group = ids[codes == code]
+            total += len(group) * self.value(group, depth - 1, width, deadline)
+        return 1 + total / len(ids)
+
+    def value(self, ids, depth, width, deadline=None):
+        """Return the expected guesses to solve the candidate IDs,
+        searching depth guesses ahead. Raises OutOfTime if the deadline
+        passes first.
+        """
+        n = len(ids)
+        if n <= 2 or depth == 0:
+            return lower_bound(n)
+        key = (ids.tobytes(), depth, width)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        if deadline is not None and timer() >= deadline:
+            raise OutOfTime
+        rows, bounds = self.ranked_guesses(ids, width)
+        best = np.inf
+        for row, bound in zip(rows.tolist(), bounds.tolist()):
+            if bound >= best:
+                break
+            best = min(best, self.expected(ids, row, depth, width, deadline))
+        if len(self.table) >= self.max_entries:
+            self.table.clear()
+        self.table[key] = best
+        return best
+
+    def score(self, wordlist, k=1, depth=2, width=10, guesses=None, deadline=None):
+        """Return the k best guesses for the wordlist and their expected
+        number of guesses to finish, lowest first.
+
+        Without guesses, only the max(width, k) guesses with the best
+        bounds are searched. Given guesses, each of them is searched in
+        the order given, skipping those whose bound can't beat the k
+        best so far. If the deadline passes, the search stops and only
+        the guesses it finished are returned.
+        """
+        index = self.index
+        if isinstance(wordlist, CandidateState):
+            ids = np.array(index.ids_in(wordlist.bits), dtype=np.intp)
+        else:
+            ids = np.sort([index.ids[w] for w in wordlist]).astype(np.intp)
+        if guesses is None:
+            k = width if k is None else k
+            rows, bounds = self.ranked_guesses(ids, max(width, k))
+        else:
+            rows = np.array([self.guess_index[w] for w in guesses], dtype=np.intp)
+            k = len(rows) if k is None else k
+            bounds = self.bounds(ids, rows)
+        scores = []
+        for row, bound in zip(rows.tolist(), bounds.tolist()):
+            if len(scores) >= k and bound >= sorted(scores)[k - 1][0]:
+                if guesses is None:
+                    # The guesses are ranked, so none of the rest can.
+                    break
+                continue
+            try:
+                value = self.expected(ids, row, depth, width, deadline)
+            except OutOfTime:
+                break
+            scores.append((value, len(scores), row))
+        scores.sort()
+        return {self.guesses[row]: value for value, _, row in scores[:k]}
+
+
+_lookahead = None
+
+
+def get_lookahead():
+    """Return the Lookahead shared by lookahead_score calls, making it
+    the first time.
+    """
+    global _lookahead
+    if _lookahead is None:
+        _lookahead = Lookahead()
+    return _lookahead
+
+
+def lookahead_score(wordlist, k=1, depth=2, width=10, guesses=None, deadline=None):
+    """Give the k best guesses from the full guess list (or from
+    guesses, if given) a score equal to their expected number of guesses
+    to solve the wordlist, searching depth guesses ahead over the width
+    most promising guesses at each step.
+
+    Unlike the other methods, lower scores are better: the result is
+    sorted lowest first, and lookahead_score.lower_is_better is True.
+    Given a deadline (a timeit.default_timer time), only the guesses
+    searched before it passes are scored.
+    """
+    if not wordlist:
+        raise ZeroDivisionError("Cannot score an empty wordlist")
+    return get_lookahead().score(wordlist, k, depth, width, guesses, deadline)
+
+
+lookahead_score.guess_list = True
+lookahead_score.lower_is_better = True
+lookahead_score.takes_deadline = True
+lookahead_score.warm_up = get_lookahead
+
+
+if __name__ == "__main__":
+    run_batch_benchmarks(lookahead_score, first_guess="soare")
@@ -2,7 +2,13 @@
 import json
 from timeit import default_timer as timer
 from pymongo import MongoClient
-from wordle_game import WordleGame, get_words, position_level_score, word_level_score
+from results_store import ResultsStore
+from wordle_core import (
+    get_words,
+    position_level_score,
+    simulate_batch,
+    word_level_score,
+)
 
 
 def list_all_collections_and_sizes():
@@ -12,7 +18,9 @@ def list_all_collections_and_sizes():
     dbs = client.list_database_names()
     for db in dbs:
         for c in client[db].list_collection_names():
-            print(json.dumps({f"{db}.{c}": client[db][c].count_documents({})}, indent=4))
+            print(
+                json.dumps({f"{db}.{c}": client[db][c].count_documents({})}, indent=4)
+            )
 
 
 def print_all_documents(db, collection):
@@ -21,7 +29,57 @@ def print_all_documents(db, collection):
         print(" " * 5, document)
 
 
-def evaluate_solution_methods(collection, *args):
+class BufferedWriter:
+    """Collect documents and write them to a collection in unordered
+    insert_many batches.
+
+    insert() blocks while a full batch is written, so at most batch_size
+    documents are held in memory. Use it as a context manager, or call
+    flush(), to write the final partial batch. The time spent writing
+    is kept in write_time.
+    """
+
+    def __init__(self, collection, batch_size=1000):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.buffer = []
+        self.written = 0
+        self.write_time = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def insert(self, document):
+        """Add a document, writing the buffer if it is full."""
+        self.buffer.append(document)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered documents."""
+        if not self.buffer:
+            return
+        start = timer()
+        self.collection.insert_many(self.buffer, ordered=False)
+        self.write_time += timer() - start
+        self.written += len(self.buffer)
+        self.buffer = []
+
+
+def compact_guesses(guesses_made):
+    """Return the guessed words and their patterns as two lists of
+    strings, e.g. ['later', ...] and ['21011', ...], instead of nested
+    [letter, value] lists.
+    """
+    words = ["".join(c for c, _ in g) for g in guesses_made]
+    patterns = ["".join(str(v) for _, v in g) for g in guesses_made]
+    return words, patterns
+
+
+def evaluate_solution_methods(collection, *args, batch_size=1000):
     """Solve all possible puzzles using the provided scoring methods.
 
     A dictionary representing each resulting attempt to solve the puzzle
@@ -29,32 +87,35 @@ def evaluate_solution_methods(collection, *args):
 
     Blacklist includes puzzles that generated exceptions. This means the
     scoring algorithm has bugs and sometimes fails.
+
+    The puzzles are solved together with simulate_batch, which scores
+    each distinct solver state once. Documents are then written with a
+    BufferedWriter in batches of batch_size, and the write time is
+    reported separately from the solve time.
     """
     for method in [*args]:
         all_solutions = get_words("wordlist_solutions.txt")
-        blacklist = []
         unsolved = []
         num_guesses = []
         start = timer()
-        for w in all_solutions:
-            try:
-                game = WordleGame(enable_solver=True, solution=w)
-                result, solved = game.solve(method=method)
+        traces, blacklist = simulate_batch(all_solutions, method=method)
+        end = timer()
+        with BufferedWriter(collection[method.__name__], batch_size) as writer:
+            for w, (result, solved) in traces.items():
                 if not solved:
                     unsolved.append(w)
                 else:
                     num_guesses.append(len(result))
-            except Exception as e:
-                blacklist.append((w, e))
-            document = {
-                "solution": w,
-                "method": method.__name__,
-                "guesses": result,
-                "score": len(result),
-                "solved": solved,
-            }
-            collection[method.__name__].insert_one(document)
-        end = timer()
+                guesses, patterns = compact_guesses(result)
+                document = {
+                    "solution": w,
+                    "method": method.__name__,
+                    "guesses": guesses,
+                    "patterns": patterns,
+                    "score": len(result),
+                    "solved": solved,
+                }
+                writer.insert(document)
         print(
             json.dumps(
                 {
@@ -65,25 +126,26 @@ def evaluate_solution_methods(collection, *args):
                     "unsolved count": len(unsolved),
                     "average score": sum(num_guesses) / len(num_guesses),
                     "elapsed time": end - start,
+                    "write time": writer.write_time,
                 },
                 indent=4,
             )
         )
 
 
-def print_average_score(collection):
-    """Print the average score for the provided collection."""
+def average_score(collection):
+    """Return the average score of the solved puzzles in the collection."""
     pipeline = [
         {"$match": {"solved": True}},
         {"$group": {"_id": None, "average": {"$avg": "$score"}}},
     ]
-    avg = list(collection.aggregate(pipeline))[0]["average"]
-    print("Score distribution:")
-    print(f"   Average  : {avg}")
+    return list(collection.aggregate(pipeline))[0]["average"]
 
 
-def print_score_distribution(collection):
-    """Print the distribution of scores for the provided collection."""
+def score_distribution(collection):
+    """Return a score -> count dict for the solved puzzles in the
+    collection.
+    """
     pipeline = [
         {"$match": {"solved": True}},
         {
@@ -94,22 +156,61 @@ def print_score_distribution(collection):
         },
         {"$sort": {"_id": 1}},
     ]
-    for r in collection.aggregate(pipeline):
-        print(f"   {r['_id']} guesses: {r['count']}")
+    return {r["_id"]: r["count"] for r in collection.aggregate(pipeline)}
 
 
-def print_failed_solutions(collection):
-    """Print the number of unsolved puzzles and the target solution."""
-    pipeline = [
-        {"$match": {"solved": False}},
-        {"$group": {"_id": None, "count": {"$sum": 1}}},
-    ]
-    print(f"Failed to solve {list(collection.aggregate(pipeline))[0]['count']} puzzles:")
+def failed_solutions(collection):
+    """Return the solutions of the unsolved puzzles in the collection."""
     pipeline = [
         {"$match": {"solved": False}},
         {"$group": {"_id": "$solution"}},
     ]
-    print([r["_id"] for r in collection.aggregate(pipeline)])
+    return [r["_id"] for r in collection.aggregate(pipeline)]
+
+
+class MongoStore(ResultsStore):
+    """A results store with one Mongo collection per scoring method."""
+
+    def __init__(self, db, batch_size=1000):
+        self.db = db
+        self.batch_size = batch_size
+
+    def insert_results(self, method, rows):
+        """Write the rows to the method's collection in batches."""
+        with BufferedWriter(self.db[method], self.batch_size) as writer:
+            for r in rows:
+                writer.insert({"method": method, **r})
+
+    def average_score(self, method):
+        """Return the average score of the method's solved puzzles."""
+        return average_score(self.db[method])
+
+    def score_distribution(self, method):
+        """Return the score distribution of the method's solved puzzles."""
+        return score_distribution(self.db[method])
+
+    def failed_solutions(self, method):
+        """Return the solutions the method failed to solve."""
+        return failed_solutions(self.db[method])
+
+
+def print_average_score(collection):
+    """Print the average score for the provided collection."""
+    print("Score distribution:")
+    print(f"   Average  : {average_score(collection)}")
+
+
+def print_score_distribution(collection):
+    """Print the distribution of scores for the provided collection."""
+    for k, v in score_distribution(collection).items():
+        print(f"   {k} guesses: {v}")
+
+
+def print_failed_solutions(collection):
+    """Print the number of unsolved puzzles and the target solution."""
+    words = failed_solutions(collection)
+    print(f"Failed to solve {len(words)} puzzles:")
+    print(words)
 
 
 if __name__ == "__main__":
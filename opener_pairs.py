@@ -0,0 +1,170 @@
+"""Search for the best pair of fixed openers.
+
+Many players always open with the same two words, e.g. 'orate' then
+'sulci'. A pair is scored by the expected information (in bits) of the
+joint feedback of both words, i.e. how finely the two patterns together
+split the solution list.
+
+There are far too many pairs to score them all, but the joint
+information of a pair is never more than the sum of the information of
+each word. The words are ranked by their own information, and a pair is
+only scored while that sum can still beat the current top N.
+"""
+import heapq
+from multiprocessing import Pool
+from timeit import default_timer as timer
+
+import numpy as np
+
+from patterns import NUM_PATTERNS, get_pattern_matrix
+
+
+def joint_information(first, codes):
+    """Return the expected information of the joint feedback of the
+    first word's codes with each row of codes.
+    """
+    keys = first.astype(np.uint16) * NUM_PATTERNS + codes
+    ordered = np.sort(keys, axis=1)
+    rows, n = ordered.shape
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    flat = np.flatnonzero(starts)
+    sizes = np.diff(np.append(flat, starts.size)).astype(np.float64)
+    runs = np.count_nonzero(starts, axis=1)
+    first_run = np.concatenate(([0], np.cumsum(runs)[:-1]))
+    total = np.add.reduceat(sizes * np.log2(sizes), first_run)
+    return np.log2(n) - total / n
+
+
+def joint_groups(first, second):
+    """Return the group sizes of the joint feedback of two code rows."""
+    keys = first.astype(np.uint16) * NUM_PATTERNS + second
+    return np.unique(keys, return_counts=True)[1]
+
+
+_search = {}
+
+
+def _init_pair_worker(order, information, top_n, chunk_size):
+    """Set up the ranked words in a worker."""
+    _search["matrix"] = np.asarray(get_pattern_matrix().matrix)
+    _search["order"] = order
+    _search["information"] = information
+    _search["top_n"] = top_n
+    _search["chunk_size"] = chunk_size
+
+
+def _search_first_word(task):
+    """Return the best (information, i, j) pairs of the i-th ranked word
+    with the lower ranked words j > i that score at least threshold.
+    """
+    i, threshold = task
+    matrix = _search["matrix"]
+    order = _search["order"]
+    information = _search["information"]
+    top_n = _search["top_n"]
+    chunk_size = _search["chunk_size"]
+    first = matrix[order[i]]
+    best = []
+    start = i + 1
+    while start < len(order):
+        beat = best[0][0] if len(best) == top_n else threshold
+        # information is sorted, so the rest of the row can't beat it.
+        if information[i] + information[start] < beat:
+            break
+        stop = min(start + chunk_size, len(order))
+        scores = joint_information(first, matrix[order[start:stop]])
+        for j, score in enumerate(scores.tolist(), start):
+            if score < beat:
+                continue
+            if len(best) < top_n:
+                heapq.heappush(best, (score, -j))
+            elif (score, -j) > best[0]:
+                heapq.heapreplace(best, (score, -j))
+        start = stop
+    return [(score, i, -neg_j) for score, neg_j in best]
+
+
+def search_pairs(
+    top_n=20,
+    seed_size=100,
+    processes=1,
+    chunk_size=256,
+    filename="opener_pairs.csv",
+):
+    """Find the top_n opener pairs by joint expected information and
+    write them as a ranked table to filename.
+
+    The pairs among the seed_size most informative words are scored
+    first, to get a score to beat. The first words are then searched
+    in rounds across a pool of worker processes, each pruning with the
+    sum of the two words' information.
+    """
+    patterns = get_pattern_matrix()
+    start = timer()
+    single = patterns.information(patterns.solutions)
+    order = np.argsort(-single, kind="stable")
+    information = single[order]
+    args = (order, information, top_n, chunk_size)
+
+    _init_pair_worker(*args)
+    seed = []
+    matrix = _search["matrix"]
+    for i in range(min(seed_size, len(order)) - 1):
+        scores = joint_information(matrix[order[i]], matrix[order[i + 1 : seed_size]])
+        seed.extend(scores.tolist())
+    threshold = sorted(seed, reverse=True)[min(top_n, len(seed)) - 1]
+
+    # The first words are searched in rounds, raising the score to beat
+    # to the current top N after each round.
+    pool = None
+    if processes > 1:
+        pool = Pool(processes, initializer=_init_pair_worker, initargs=args)
+    found = []
+    searched = 0
+    round_size = 16 * processes
+    try:
+        for first in range(0, len(order) - 1, round_size):
+            # A first word whose sum with the next word can't reach the
+            # threshold has no pair left that can, and nor do the rest.
+            tasks = [
+                (i, threshold)
+                for i in range(first, min(first + round_size, len(order) - 1))
+                if information[i] + information[i + 1] >= threshold
+            ]
+            if not tasks:
+                break
+            searched += len(tasks)
+            if pool is not None:
+                results = pool.map(_search_first_word, tasks)
+            else:
+                results = map(_search_first_word, tasks)
+            found.extend(pair for result in results for pair in result)
+            found.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+            del found[top_n:]
+            if len(found) == top_n:
+                threshold = max(threshold, found[-1][0])
+    finally:
+        if pool is not None:
+            pool.terminate()
+    end = timer()
+
+    lines = ["rank,first,second,information,groups,expected_remaining"]
+    print(f"Top {top_n} opener pairs:")
+    for rank, (score, i, j) in enumerate(found[:top_n], 1):
+        first, second = patterns.guesses[order[i]], patterns.guesses[order[j]]
+        sizes = joint_groups(matrix[order[i]], matrix[order[j]])
+        remaining = (sizes**2).sum() / sizes.sum()
+        lines.append(
+            f"{rank},{first},{second},{score:.6f},{len(sizes)},{remaining:.6f}"
+        )
+        print(f"{rank:>4} {first} {second} {score:.4f} {len(sizes)} {remaining:.3f}")
+    with open(filename, "w") as file:
+        file.write("\n".join(lines) + "\n")
+    print(f"Searched {searched} first words")
+    print(f"Elapsed time: {end - start}")
+    return found[:top_n]
+
+
+if __name__ == "__main__":
+    search_pairs(processes=4)
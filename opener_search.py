@@ -0,0 +1,249 @@
+"""Branch-and-bound search for the best first guess.
+
+Simulating every valid guess as the opener is too slow, so the openers
+are ordered by a cheap lower bound on the total number of guesses their
+games can take. Each opener's bound is then tightened, and only the
+openers whose bound could still beat the current top N are simulated.
+
+The bounds hold for any solver. Every game uses the opener. After that,
+a group of n solutions that share the opener's pattern needs at least
+2n - 1 more guesses, since the second guess can solve at most one of
+them. The tighter bound also looks at the best possible second guess
+for each group: a guess splitting the group into d patterns leaves at
+least n - d games needing a fourth guess.
+
+Those bounds are at most about 3 guesses a game, while good openers
+average well over 3.5, so few openers are pruned outright. Each opener
+is instead simulated one group at a time, largest first, and dropped
+as soon as the guesses of the groups so far plus the cheap bound on
+the rest can't beat the current top N.
+"""
+import heapq
+from timeit import default_timer as timer
+
+import numpy as np
+
+from patterns import NUM_PATTERNS, SOLVED, get_pattern_matrix, pattern_histogram
+from wordle_core import simulate_batch, word_level_score
+
+
+def total_cost(traces, blacklist, max_guesses=6):
+    """Return the total number of guesses in a simulate_batch result,
+    counting each unsolved or failed game as max_guesses + 1.
+    """
+    cost = (max_guesses + 1) * len(blacklist)
+    for guesses_made, solved in traces.values():
+        cost += len(guesses_made) if solved else max_guesses + 1
+    return cost
+
+
+def distinct_patterns(codes):
+    """Return the number of different codes in each column of a
+    solutions x guesses array of codes. Short columns compare each
+    code with the ones before it; long ones mark the codes seen.
+    """
+    n, cols = codes.shape
+    if n > 32:
+        seen = np.zeros((cols, NUM_PATTERNS), dtype=bool)
+        seen[np.arange(cols), codes] = True
+        return np.count_nonzero(seen, axis=1)
+    result = np.ones(cols, dtype=np.int64)
+    for j in range(1, n):
+        result += ~(codes[:j] == codes[j]).any(axis=0)
+    return result
+
+
+def opener_bounds(patterns=None, chunk_size=1024):
+    """Return the cheap lower bound on the total guesses of every guess
+    in the list when used as the opener.
+    """
+    if patterns is None:
+        patterns = get_pattern_matrix()
+    num_solutions = len(patterns.solutions)
+    result = np.empty(len(patterns.guesses), dtype=np.int64)
+    for start in range(0, len(patterns.guesses), chunk_size):
+        counts = pattern_histogram(patterns.matrix[start : start + chunk_size])
+        solved = counts[:, SOLVED]
+        groups = (counts > 0).sum(axis=1) - solved
+        result[start : start + chunk_size] = (
+            num_solutions + 2 * (num_solutions - solved) - groups
+        )
+    return result
+
+
+class BoundCalculator:
+    """Tightens the opener bounds using the best possible second guess
+    for each group of solutions.
+    """
+
+    def __init__(self, patterns=None):
+        if patterns is None:
+            patterns = get_pattern_matrix()
+        self.matrix = np.asarray(patterns.matrix)
+        self.by_solution = patterns.solution_major()
+        self.solution_rows = np.array(
+            [patterns.guess_index[w] for w in patterns.solutions], dtype=np.intp
+        )
+
+    def best_split(self, cols):
+        """Return the most patterns a second guess can split the group of
+        solution columns into, plus one if the guess is in the group
+        (and so might solve a game at the second guess).
+        """
+        n = len(cols)
+        codes = self.by_solution[cols]
+        best = distinct_patterns(codes[:, self.solution_rows[cols]]).max() + 1
+        # A guess outside the group can't give the solved pattern.
+        if best >= min(n, NUM_PATTERNS - 1):
+            return best
+        return max(best, distinct_patterns(codes).max())
+
+    def bound(self, row, limit=None):
+        """Return the tight lower bound on the total guesses for the guess
+        in the given matrix row as the opener. Once the bound reaches
+        limit the rest of the groups are skipped, so the result is only
+        exact when it is below limit.
+        """
+        codes = self.matrix[row]
+        counts = np.bincount(codes, minlength=NUM_PATTERNS)
+        num_solutions = len(codes)
+        solved = counts[SOLVED]
+        groups = np.count_nonzero(counts) - solved
+        result = num_solutions + 2 * (num_solutions - solved) - groups
+        order = np.argsort(codes, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)))
+        for code in np.argsort(-counts, kind="stable"):
+            n = counts[code]
+            if n <= 2:
+                break
+            if limit is not None and result >= limit:
+                break
+            cols = order[starts[code] : starts[code + 1]]
+            # 3n - best_split instead of the cheap bound's 2n - 1.
+            result += n + 1 - self.best_split(cols)
+        return int(result)
+
+
+def opener_cost(
+    row,
+    method=word_level_score,
+    limit=None,
+    max_guesses=6,
+    hard_mode=False,
+    patterns=None,
+):
+    """Return the total_cost of the games with the guess in the given
+    matrix row as the opener, simulating each group of solutions that
+    share the opener's pattern in turn, largest first. Once the cost of
+    the groups so far plus the cheap bound on the rest reaches limit the
+    rest are skipped, so the result is only exact when it is below
+    limit.
+    """
+    if patterns is None:
+        patterns = get_pattern_matrix()
+    codes = np.asarray(patterns.matrix[row])
+    counts = np.bincount(codes, minlength=NUM_PATTERNS)
+    num_solutions = len(codes)
+    solved = counts[SOLVED]
+    groups = np.count_nonzero(counts) - solved
+    # The opener solves its own game. The rest need 3n - 1 guesses for
+    # each group of n.
+    cost = solved
+    rest = 3 * (num_solutions - solved) - groups
+    order = np.argsort(codes, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    for code in np.argsort(-counts, kind="stable"):
+        n = counts[code]
+        if n == 0:
+            break
+        if code == SOLVED:
+            continue
+        if limit is not None and cost + rest >= limit:
+            break
+        solutions = [
+            patterns.solutions[i] for i in order[starts[code] : starts[code + 1]]
+        ]
+        traces, blacklist = simulate_batch(
+            solutions=solutions,
+            method=method,
+            first_guess=patterns.guesses[row],
+            max_guesses=max_guesses,
+            hard_mode=hard_mode,
+        )
+        cost += total_cost(traces, blacklist, max_guesses)
+        rest -= 3 * n - 1
+    return int(cost + rest)
+
+
+def search_openers(
+    method=word_level_score, top_n=10, openers=None, max_guesses=6, hard_mode=False
+):
+    """Find the top_n openers for a scoring method, ranked by the
+    average number of guesses over all solutions (an unsolved game
+    counts as max_guesses + 1). Ties keep the order of the cheap bound.
+    openers limits the search to a list of words.
+
+    Returns a dict with the ranked (opener, average score) pairs, the
+    number of openers simulated and pruned, and how many of the
+    simulations were cut short.
+    """
+    patterns = get_pattern_matrix()
+    num_solutions = len(patterns.solutions)
+    cheap = opener_bounds(patterns)
+    calculator = BoundCalculator(patterns)
+    if openers is None:
+        rows = np.arange(len(patterns.guesses))
+    else:
+        rows = np.array([patterns.guess_index[w] for w in openers], dtype=np.intp)
+    rows = rows[np.argsort(cheap[rows], kind="stable")].tolist()
+
+    start = timer()
+    best = []
+    simulated = tightened = pruned = cut_short = 0
+    bound_time = simulate_time = 0.0
+    for rank, row in enumerate(rows):
+        worst = -best[0][0] if len(best) == top_n else None
+        if worst is not None and cheap[row] >= worst:
+            break
+        # Tightening only pays while it prunes enough simulations to
+        # save more time than it costs, which depends on the method.
+        saved = pruned * simulate_time / max(simulated, 1)
+        if worst is not None and (tightened < 20 or saved > bound_time):
+            tick = timer()
+            bound = calculator.bound(row, worst)
+            bound_time += timer() - tick
+            tightened += 1
+            if bound >= worst:
+                pruned += 1
+                continue
+        tick = timer()
+        cost = opener_cost(row, method, worst, max_guesses, hard_mode, patterns)
+        simulate_time += timer() - tick
+        simulated += 1
+        if worst is not None and cost >= worst:
+            cut_short += 1
+            continue
+        entry = (-cost, -rank, patterns.guesses[row])
+        if len(best) < top_n:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+    end = timer()
+
+    ranked = [(opener, -cost / num_solutions) for cost, _, opener in sorted(best)[::-1]]
+    print(f"Top {len(ranked)} openers for {method.__name__}:")
+    for i, (opener, average) in enumerate(ranked, 1):
+        print(f"{i:>4} {opener} {average:.4f}")
+    print(f"Simulated {simulated} of {len(rows)} openers ({cut_short} cut short)")
+    print(f"Elapsed time: {end - start}")
+    return {
+        "openers": ranked,
+        "simulated": simulated,
+        "pruned": len(rows) - simulated,
+        "cut short": cut_short,
+        "elapsed time": end - start,
+    }
+
+
+if __name__ == "__main__":
+    search_openers(word_level_score, top_n=10)
@@ -0,0 +1,331 @@
+"""A precomputed feedback pattern engine for the py-wordle solver.
+
+Every guess/solution pair has a feedback pattern made of five values
+(0 - grey, 1 - yellow, 2 - green). The pattern is packed into a single
+base-3 number, reading the positions left to right, so a pattern
+written as the string '21011' has the code int('21011', 3) == 193.
+Codes range from 0 (all grey) to 242 (all green) and fit in one byte.
+
+The full guess x solution matrix of codes is computed once, saved next
+to the word lists and memory-mapped on later runs, so looking up a
+pattern is a single array index.
+"""
+import hashlib
+import os
+import tempfile
+from statistics import NormalDist
+
+import numpy as np
+
+from word_table import get_words, words_to_array
+
+NUM_PATTERNS = 3**5
+SOLVED = NUM_PATTERNS - 1
+
+
+def get_pattern(guess, solution):
+    """Return the feedback code for the guess against the solution,
+    computed directly rather than looked up.
+    """
+    values = [0] * 5
+    count = {}
+    for g, s in zip(guess, solution):
+        if g != s:
+            count[s] = count.get(s, 0) + 1
+    for i, (g, s) in enumerate(zip(guess, solution)):
+        if g == s:
+            values[i] = 2
+        elif count.get(g, 0) > 0:
+            values[i] = 1
+            count[g] -= 1
+    return encode_values(values)
+
+
+def encode_values(values):
+    """Return the code for a list of five 0/1/2 values."""
+    code = 0
+    for v in values:
+        code = code * 3 + v
+    return code
+
+
+def _decode(code):
+    values = [0] * 5
+    for i in range(4, -1, -1):
+        code, values[i] = divmod(code, 3)
+    return tuple(values)
+
+
+_decoded = [_decode(code) for code in range(NUM_PATTERNS)]
+
+
+def decode_pattern(code):
+    """Return the list of five 0/1/2 values for a pattern code."""
+    return list(_decoded[code])
+
+
+def pattern_to_string(code):
+    """Return the pattern code as a string, e.g. 193 -> '21011'."""
+    return "".join(str(v) for v in decode_pattern(code))
+
+
+def encode_wordscore(wordscore):
+    """Return the code for a wordscore list such as
+    [['l', 2], ['a', 1], ['t', 0], ['e', 1], ['r', 1]].
+    """
+    return encode_values([v for _, v in wordscore])
+
+
+def compute_pattern_matrix(guesses, solutions, chunk_size=512):
+    """Return the guess x solution matrix of feedback codes.
+
+    The Wordle rules are applied column-wise for a chunk of guesses at a
+    time: a letter that isn't green is yellow while the solution still
+    has unmatched copies of it that weren't used up by greens or by
+    earlier yellows of the same letter.
+    """
+    g_all = words_to_array(guesses)
+    s = words_to_array(solutions)
+    result = np.empty((len(guesses), len(solutions)), dtype=np.uint8)
+    weights = np.array([81, 27, 9, 3, 1], dtype=np.uint8)
+    for start in range(0, len(guesses), chunk_size):
+        g = g_all[start : start + chunk_size, None, :]
+        green = g == s[None, :, :]
+        codes = np.zeros(green.shape[:2], dtype=np.uint8)
+        for i in range(5):
+            # Copies of this letter in solution positions that aren't green.
+            available = ((s[None, :, :] == g[:, :, i, None]) & ~green).sum(axis=2)
+            # Copies of this letter already used by earlier non-green letters.
+            used = np.zeros_like(available)
+            for j in range(i):
+                used += (g[:, :, j] == g[:, :, i]) & ~green[:, :, j]
+            yellow = ~green[:, :, i] & (used < available)
+            codes += weights[i] * (2 * green[:, :, i] + yellow).astype(np.uint8)
+        result[start : start + chunk_size] = codes
+    return result
+
+
+def pattern_histogram(codes):
+    """Return the per-row count of each pattern code in a 2D array of
+    codes, as a rows x NUM_PATTERNS array.
+    """
+    rows = codes.shape[0]
+    offsets = np.arange(rows, dtype=np.intp)[:, None] * NUM_PATTERNS
+    flat = (codes + offsets).ravel()
+    counts = np.bincount(flat, minlength=rows * NUM_PATTERNS)
+    return counts.reshape(rows, NUM_PATTERNS)
+
+
+def expected_information(counts):
+    """Return the entropy in bits of each row of pattern counts, which
+    is the expected information gained from the guess.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.where(counts > 0, np.log2(counts), 0.0)
+    return np.log2(total) - (counts * logs).sum(axis=1) / total
+
+
+def sorted_information(codes):
+    """Return the same entropies as expected_information for a 2D array
+    of codes, counting the patterns by sorting each row. For rows
+    shorter than NUM_PATTERNS this is cheaper than a full histogram.
+    """
+    rows, n = codes.shape
+    ordered = np.sort(codes, axis=1)
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    runs = np.cumsum(starts, axis=1) - 1
+    offsets = np.arange(rows, dtype=np.intp)[:, None] * n
+    counts = np.bincount((runs + offsets).ravel(), minlength=rows * n)
+    counts = counts.reshape(rows, n).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.where(counts > 0, np.log2(counts), 0.0)
+    return np.log2(n) - (counts * logs).sum(axis=1) / n
+
+
+def wordlist_hash(guesses, solutions):
+    """Return a short hash identifying the pair of word lists."""
+    digest = hashlib.sha1()
+    digest.update("\n".join(guesses).encode("ascii"))
+    digest.update(b"\0")
+    digest.update("\n".join(solutions).encode("ascii"))
+    return digest.hexdigest()[:16]
+
+
+class PatternMatrix:
+    """A guess x solution matrix of feedback codes with word lookups."""
+
+    def __init__(self, guesses, solutions, matrix):
+        self.guesses = guesses
+        self.solutions = solutions
+        self.matrix = matrix
+        self.guess_index = {w: i for i, w in enumerate(guesses)}
+        self.solution_index = {w: i for i, w in enumerate(solutions)}
+        self._solution_major = None
+
+    def pattern(self, guess, solution):
+        """Return the feedback code for the guess against the solution.
+        Words outside the lists fall back to a direct computation.
+        """
+        i = self.guess_index.get(guess)
+        j = self.solution_index.get(solution)
+        if i is None or j is None:
+            return get_pattern(guess, solution)
+        return self.matrix[i, j].item()
+
+    def row(self, guess):
+        """Return the codes for the guess against every solution."""
+        return self.matrix[self.guess_index[guess]]
+
+    def codes(self, guesses, solutions):
+        """Return the len(guesses) x len(solutions) matrix of codes."""
+        rows = np.array([self.guess_index[w] for w in guesses], dtype=np.intp)
+        cols = np.array([self.solution_index[w] for w in solutions], dtype=np.intp)
+        return self.matrix[np.ix_(rows, cols)]
+
+    def bucket_counts(self, guesses, solutions):
+        """Return a len(guesses) x NUM_PATTERNS matrix with the number of
+        solutions that give each pattern for each guess.
+        """
+        codes = self.codes(guesses, solutions)
+        return pattern_histogram(codes)
+
+    def information(self, solutions, guesses=None, chunk_size=1024):
+        """Return the expected information of each guess (every guess in
+        the list by default) against the solutions, working through the
+        guesses a chunk at a time to bound memory.
+        """
+        cols = np.array([self.solution_index[w] for w in solutions], dtype=np.intp)
+        if guesses is None:
+            num_guesses = len(self.guesses)
+        else:
+            rows = np.array([self.guess_index[w] for w in guesses], dtype=np.intp)
+            num_guesses = len(rows)
+        result = np.empty(num_guesses)
+        for start in range(0, num_guesses, chunk_size):
+            if guesses is None:
+                codes = self.matrix[start : start + chunk_size][:, cols]
+            else:
+                codes = self.matrix[rows[start : start + chunk_size]][:, cols]
+            if len(cols) < NUM_PATTERNS:
+                result[start : start + chunk_size] = sorted_information(codes)
+            else:
+                counts = pattern_histogram(codes)
+                result[start : start + chunk_size] = expected_information(counts)
+        return result
+
+    def solution_major(self):
+        """Return the codes as a solutions x guesses array, copied once so
+        that the codes of a few solutions are contiguous rows.
+        """
+        if self._solution_major is None:
+            self._solution_major = np.ascontiguousarray(np.asarray(self.matrix).T)
+        return self._solution_major
+
+    def sampled_information(
+        self, solutions, sample_size, seed=0, guesses=None, confidence=0.95
+    ):
+        """Estimate the expected information of each guess (every guess
+        in the list by default) from a random sample of sample_size of
+        the solutions, drawn with a fixed seed.
+
+        Returns the estimates and the half widths of their confidence
+        intervals. The estimates add the Miller-Madow correction for
+        the buckets a sample misses. The intervals use the variance of
+        the information each sampled solution gets, shrunk for sampling
+        without replacement. With sample_size no smaller than the
+        solutions, the information is exact and the half widths are 0.
+        """
+        words = list(solutions)
+        n = len(words)
+        if sample_size >= n:
+            return self.information(words, guesses), np.zeros(
+                len(self.guesses) if guesses is None else len(guesses)
+            )
+        rng = np.random.default_rng(seed)
+        sample = [words[i] for i in np.sort(rng.choice(n, sample_size, replace=False))]
+        cols = np.array([self.solution_index[w] for w in sample], dtype=np.intp)
+        codes = self.solution_major()[cols]
+        if guesses is not None:
+            codes = codes[:, [self.guess_index[w] for w in guesses]]
+        counts = pattern_histogram(codes.T)
+        # The bucket sizes are small integers, so c log c and c log^2 c
+        # are looked up rather than computed for every bucket.
+        sizes = np.arange(1, sample_size + 1, dtype=np.float64)
+        log_sizes = np.concatenate(([0.0], np.log2(sizes)))
+        sizes = np.concatenate(([0.0], sizes))
+        plogp = (sizes * log_sizes)[counts].sum(axis=1) / sample_size
+        plog2p = (sizes * log_sizes**2)[counts].sum(axis=1) / sample_size
+        log_n = np.log2(sample_size)
+        information = log_n - plogp
+        spread = plog2p - 2 * log_n * plogp + log_n**2 - information**2
+        buckets = np.count_nonzero(counts, axis=1)
+        estimate = information + (buckets - 1) / (2 * sample_size * np.log(2))
+        variance = np.maximum(spread, 0) / sample_size * (n - sample_size) / (n - 1)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        return estimate, z * np.sqrt(variance)
+
+
+def cache_filename(guess_file, solution_file, guesses, solutions):
+    """Return the cache file used for this pair of word lists."""
+    directory = os.path.dirname(os.path.abspath(guess_file))
+    key = wordlist_hash(guesses, solutions)
+    return os.path.join(directory, f"pattern_matrix_{key}.npy")
+
+
+def load_pattern_matrix(
+    guess_file="wordlist_guesses.txt", solution_file="wordlist_solutions.txt"
+):
+    """Return the PatternMatrix for the word files. The matrix is
+    memory-mapped from the cache file next to the word lists, which is
+    computed and saved on the first run. If the cache can't be written,
+    the computed matrix is kept in memory instead.
+    """
+    guesses = get_words(guess_file)
+    solutions = get_words(solution_file)
+    filename = cache_filename(guess_file, solution_file, guesses, solutions)
+    try:
+        matrix = np.load(filename, mmap_mode="r")
+        if matrix.shape != (len(guesses), len(solutions)):
+            raise ValueError(f"Unexpected pattern matrix shape in {filename}")
+    except (OSError, ValueError):
+        matrix = compute_pattern_matrix(guesses, solutions)
+        save_pattern_matrix(matrix, filename)
+    return PatternMatrix(guesses, solutions, matrix)
+
+
+def save_pattern_matrix(matrix, filename):
+    """Save the matrix to filename through a temporary file of its own,
+    so processes building the cache at the same time don't clash.
+    Returns False if the file couldn't be written.
+    """
+    tmp = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(filename), suffix=".tmp.npy", delete=False
+        ) as file:
+            tmp = file.name
+            np.save(file, matrix)
+        os.replace(tmp, filename)
+    except OSError:
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    return True
+
+
+_matrices = {}
+
+
+def get_pattern_matrix(
+    guess_file="wordlist_guesses.txt", solution_file="wordlist_solutions.txt"
+):
+    """Return the PatternMatrix for the word files, loading it only once
+    per process.
+    """
+    key = (guess_file, solution_file)
+    if key not in _matrices:
+        _matrices[key] = load_pattern_matrix(guess_file, solution_file)
+    return _matrices[key]
@@ -0,0 +1,221 @@
+"""Pluggable stores for solver results, with an embedded SQLite backend.
+
+A results store holds one row per solved puzzle per scoring method and
+answers the three reports used by the database integrations: the
+average score and the score distribution of the solved puzzles, and the
+list of failed solutions. SQLiteStore needs no server, so the reports
+can be run in CI or on a laptop. The Mongo and Cassandra backends live
+in mongo_db_integration.py and cassandra_db_integration.py.
+"""
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from timeit import default_timer as timer
+
+from wordle_core import (
+    get_words,
+    position_level_score,
+    simulate_batch,
+    word_level_score,
+)
+
+
+class ResultsStore(ABC):
+    """The interface every results backend implements.
+
+    Rows are dictionaries with 'solution', 'score', 'solved' and
+    'guesses' (the list of guessed words) keys.
+    """
+
+    @abstractmethod
+    def insert_results(self, method, rows):
+        """Store the rows for a scoring method."""
+
+    @abstractmethod
+    def average_score(self, method):
+        """Return the average score of the method's solved puzzles."""
+
+    @abstractmethod
+    def score_distribution(self, method):
+        """Return a score -> count dict for the method's solved puzzles,
+        sorted by score.
+        """
+
+    @abstractmethod
+    def failed_solutions(self, method):
+        """Return the solutions the method failed to solve."""
+
+    def close(self):
+        """Release any connections held by the store."""
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    method TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    solved INTEGER NOT NULL,
+    guesses TEXT,
+    PRIMARY KEY (method, solution)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS results_failed
+    ON results (method, solution) WHERE solved = 0;
+
+CREATE TABLE IF NOT EXISTS score_counts (
+    method TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (method, score)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results
+WHEN NEW.solved
+BEGIN
+    INSERT INTO score_counts (method, score, games)
+    VALUES (NEW.method, NEW.score, 1)
+    ON CONFLICT (method, score) DO UPDATE SET games = games + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results
+WHEN OLD.solved
+BEGIN
+    UPDATE score_counts SET games = games - 1
+    WHERE method = OLD.method AND score = OLD.score;
+END;
+"""
+
+
+class SQLiteStore(ResultsStore):
+    """A results store in a local SQLite file.
+
+    The database runs in WAL mode and rows are written in batched
+    transactions. Triggers keep a small score_counts table up to date
+    as rows are written, so the average and distribution reports read a
+    handful of rows however many games are stored. Failed solutions are
+    read from a partial index over the unsolved rows.
+    """
+
+    def __init__(self, filename="results.db", batch_size=10000):
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        # Replacing a row must run the delete trigger to keep the counts.
+        self.connection.execute("PRAGMA recursive_triggers = ON")
+        self.connection.executescript(SQLITE_SCHEMA)
+
+    def insert_results(self, method, rows):
+        """Store the rows for a scoring method, replacing any earlier
+        result for the same solution.
+        """
+        command = (
+            "INSERT OR REPLACE INTO results (method, solution, score, solved, guesses)"
+            " VALUES (?, ?, ?, ?, ?)"
+        )
+        for i in range(0, len(rows), self.batch_size):
+            batch = [
+                (
+                    method,
+                    r["solution"],
+                    r["score"],
+                    int(r["solved"]),
+                    json.dumps(r.get("guesses")),
+                )
+                for r in rows[i : i + self.batch_size]
+            ]
+            with self.connection:
+                self.connection.executemany(command, batch)
+
+    def average_score(self, method):
+        """Return the average score from the score_counts table."""
+        query = (
+            "SELECT CAST(SUM(score * games) AS REAL) / SUM(games)"
+            " FROM score_counts WHERE method = ?"
+        )
+        return self.connection.execute(query, (method,)).fetchone()[0]
+
+    def score_distribution(self, method):
+        """Return the score distribution from the score_counts table."""
+        query = (
+            "SELECT score, games FROM score_counts"
+            " WHERE method = ? AND games > 0 ORDER BY score"
+        )
+        return dict(self.connection.execute(query, (method,)))
+
+    def failed_solutions(self, method):
+        """Return the unsolved solutions, read through the partial index."""
+        # Without statistics SQLite prefers the primary key, which reads
+        # every row of the method.
+        query = (
+            "SELECT solution FROM results INDEXED BY results_failed"
+            " WHERE method = ? AND solved = 0"
+        )
+        return [r[0] for r in self.connection.execute(query, (method,))]
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+
+def evaluate_solution_methods(store, *args):
+    """Solve all possible puzzles using the provided scoring methods and
+    write the results to the store.
+    """
+    for method in [*args]:
+        all_solutions = get_words("wordlist_solutions.txt")
+        start = timer()
+        traces, blacklist = simulate_batch(all_solutions, method=method)
+        end = timer()
+        rows = [
+            {
+                "solution": w,
+                "score": len(result),
+                "solved": solved,
+                "guesses": ["".join(c for c, _ in g) for g in result],
+            }
+            for w, (result, solved) in traces.items()
+        ]
+        store.insert_results(method.__name__, rows)
+        print(
+            json.dumps(
+                {
+                    "method": method.__name__,
+                    "blacklist": blacklist,
+                    "blacklist count": len(blacklist),
+                    "elapsed time": end - start,
+                    "write time": timer() - end,
+                },
+                indent=4,
+            )
+        )
+
+
+def print_average_score(store, method):
+    """Print the average score for the provided method."""
+    print(f"   Average  : {store.average_score(method)}")
+
+
+def print_score_distribution(store, method):
+    """Print the distribution of scores for the provided method."""
+    for k, v in store.score_distribution(method).items():
+        print(f"   {k} guesses: {v}")
+
+
+def print_failed_solutions(store, method):
+    """Print the number of unsolved puzzles and the target solution."""
+    words = store.failed_solutions(method)
+    print(f"Failed to solve {len(words)} puzzles:")
+    print(words)
+
+
+if __name__ == "__main__":
+    sqlite_store = SQLiteStore("results.db")
+    evaluate_solution_methods(sqlite_store, word_level_score, position_level_score)
+    for m in (word_level_score, position_level_score):
+        m_name = m.__name__
+        print("\n", "-" * 10, f"{m_name}", "-" * 10)
+        print_average_score(sqlite_store, m_name)
+        print_score_distribution(sqlite_store, m_name)
+        print_failed_solutions(sqlite_store, m_name)
+    sqlite_store.close()
@@ -0,0 +1,81 @@
+"""A bounded LRU cache in front of the scoring methods.
+
+Many games in a benchmark reach exactly the same list of possible
+solutions after the first couple of guesses. The cache keys each
+scoring call on the method and a fingerprint of the word list, so
+repeated states return the stored scores immediately.
+"""
+import sys
+from collections import OrderedDict
+
+from word_index import CandidateState
+
+
+def fingerprint(wordlist):
+    """Return a key that identifies a word list exactly. A
+    CandidateState is keyed on its index and bitset, which is cheap to
+    hash; any other word list on the tuple of its words.
+    """
+    if isinstance(wordlist, CandidateState):
+        return wordlist.index, wordlist.bits
+    return tuple(wordlist)
+
+
+class ScoreCache:
+    """LRU cache of scoring results, limited to roughly max_bytes of
+    memory.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def entry_size(scores):
+        """Return the approximate memory used by a scoring result. The
+        words themselves are shared with the word lists.
+        """
+        return sys.getsizeof(scores) + 24 * len(scores)
+
+    def score(self, method, wordlist, k=1):
+        """Return method(wordlist, k), using the cached result if there
+        is one. Results are keyed on the method object itself, so any
+        callable works, functools.partial included.
+        """
+        key = (method, k, fingerprint(wordlist))
+        scores = self.entries.get(key)
+        if scores is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return scores
+        self.misses += 1
+        scores = method(wordlist, k)
+        size = self.entry_size(scores)
+        if size <= self.max_bytes:
+            self.entries[key] = scores
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= self.entry_size(evicted)
+                self.evictions += 1
+        return scores
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self.entries.clear()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary of cache statistics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.size,
+        }
@@ -1,9 +1,17 @@
 """Do some fun analytics on the wordle word sets"""
 
+import hashlib
+import heapq
+import os
 import string
+from multiprocessing import Pool
+
 import matplotlib.pyplot as plt
 
 from colorama import init
+from patterns import decode_pattern, get_pattern_matrix
+from word_index import WordIndex
+from word_table import get_words
 
 init()
 
@@ -139,14 +147,22 @@ def generate_bar_graph_by_position(filename):
         generate_bar_graph(counts, f"position {i+1} in {filename}")
 
 
-def get_min_key(d):
-    """Return the key from the dict with the min value."""
-    return min(d, key=d.get)
+def get_min_key(d, k=None):
+    """Return the key from the dict with the min value, or a list of the
+    k keys with the lowest values if k is given.
+    """
+    if k is None:
+        return min(d, key=d.get)
+    return heapq.nsmallest(k, d, key=d.get)
 
 
-def get_max_key(d):
-    """Return the key from the dict with the max value."""
-    return max(d, key=d.get)
+def get_max_key(d, k=None):
+    """Return the key from the dict with the max value, or a list of the
+    k keys with the highest values if k is given.
+    """
+    if k is None:
+        return max(d, key=d.get)
+    return heapq.nlargest(k, d, key=d.get)
 
 
 def sort_dict(d, reverse=True):
@@ -154,6 +170,16 @@ def sort_dict(d, reverse=True):
     return {k: v for k, v in sorted(d.items(), key=lambda item: item[1], reverse=reverse)}
 
 
+def top_items(d, k=None):
+    """Return the k items of the dict with the highest values, highest
+    first, or the whole dict sorted when k is None. Equal values keep
+    their dict order, the same as sort_dict.
+    """
+    if k is None:
+        return sort_dict(d, reverse=True)
+    return dict(heapq.nlargest(k, d.items(), key=lambda item: item[1]))
+
+
 def normalize_dict(d):
     """Turn the dictionary values into percentages"""
     total = sum(d.values())
@@ -251,15 +277,6 @@ def report_word_difficulty(filename):
 """
 
 
-def get_words(filename):
-    """Return a list of all the words."""
-    result = []
-    with open(filename) as file:
-        for line in file:
-            result.append(line.rstrip())
-    return result
-
-
 def contains(wordlist, letter):
     """Return a list of words that contain the correct letter."""
     result = []
@@ -377,9 +394,10 @@ def get_letter_scores_by_position(wordlist):
     return scores
 
 
-def position_level_score(wordlist):
+def position_level_score(wordlist, k=1):
     """Calculate a score for each word, using scores that are aware of
-    positions.
+    positions. Returns the k best words, or all of them sorted when k
+    is None.
     """
     char_frequency = get_letter_scores_by_position(wordlist)
     result = {}
@@ -388,12 +406,13 @@ def position_level_score(wordlist):
         for i, c in enumerate(word):
             this_score += char_frequency[c][i]
         result[word] = this_score
-    return sort_dict(result, reverse=True)
+    return top_items(result, k)
 
 
-def word_level_score(wordlist):
+def word_level_score(wordlist, k=1):
     """Give a score to each word. Each letter adds the % chance it has
-    of occuring in a word to the score for the whole word.
+    of occuring in a word to the score for the whole word. Returns the
+    k best words, or all of them sorted when k is None.
     """
     scores = get_letter_scores(wordlist)
     result = {}
@@ -403,7 +422,7 @@ def word_level_score(wordlist):
             if char in w:
                 this_score += scores[char]
         result[w] = this_score
-    return sort_dict(result, reverse=True)
+    return top_items(result, k)
 
 
 def count_at_position(wordlist):
@@ -425,27 +444,41 @@ def print_scores(score_dict, num=15000):
 
 
 def solve(
-    wordlist, word, max_guesses=6, p=True, start_word=None, method=word_level_score
+    wordlist,
+    word,
+    max_guesses=6,
+    p=True,
+    start_word=None,
+    method=word_level_score,
+    index=None,
 ):
-    """Simulate a game played"""
+    """Simulate a game played. The feedback for each guess is looked up
+    in the pattern matrix, and the candidate words are tracked as a
+    bitset over the index, which is built from wordlist if not provided.
+    """
+    if index is None:
+        index = WordIndex(wordlist)
+    patterns = get_pattern_matrix()
+    colors = ["", Colors.fg.YELLOW, Colors.fg.GREEN]
+    candidates = index.all
     if p:
         print(f"-- Trying to guess '{word}' with method '{method.__name__}'")
     for num in range(1, max_guesses + 1):
         if num == 1 and start_word is not None:
             guess_word = start_word
         else:
-            guess_word = next(iter(method(wordlist)))
-        result = ""
-        for i, char in enumerate(guess_word):
-            if char == word[i]:
-                result += f"{Colors.fg.GREEN}{char}{Colors.reset}"
-                wordlist = contains_at_position(wordlist, char, i + 1)
-            elif char in word:
-                result += f"{Colors.fg.YELLOW}{char}{Colors.reset}"
-                wordlist = contains_not_at_position(wordlist, char, i + 1)
-            else:
-                result += char
-                wordlist = does_not_contain(wordlist, char)
+            guess_word = next(iter(method(index.words_in(candidates))))
+        wordscore = [
+            [char, val]
+            for char, val in zip(
+                guess_word, decode_pattern(patterns.pattern(guess_word, word))
+            )
+        ]
+        result = "".join(
+            f"{colors[val]}{char}{Colors.reset}" if val else char
+            for char, val in wordscore
+        )
+        candidates = index.reduce(wordscore, candidates)
         if p:
             print(f"Guess {num}: {result}")
         if word == guess_word:
@@ -457,37 +490,119 @@ def solve(
     return None, word
 
 
-def solve_with_stats(wordlist, method=word_level_score):
-    """Collect stats on solver."""
+_sweep = {}
+
+
+def _init_sweep_worker(words, method):
+    """Set up the word list and index once in each sweep worker."""
+    _sweep["words"] = words
+    _sweep["index"] = WordIndex(words)
+    _sweep["method"] = method
+
+
+def _sweep_start_word(start_word):
+    """Solve every puzzle from one start word. Returns the start word,
+    average score, max score and number of failed puzzles.
+    """
+    words, index, method = _sweep["words"], _sweep["index"], _sweep["method"]
+    score_list = []
+    failed = 0
+    for w in words:
+        score, _ = solve(
+            words,
+            w,
+            max_guesses=26,
+            p=False,
+            start_word=start_word,
+            method=method,
+            index=index,
+        )
+        if score is None or score > 6:
+            failed += 1
+        score_list.append(score)
+    avg = sum(score_list) / len(score_list)
+    return start_word, avg, max(score_list), failed
+
+
+def checkpoint_line(method, wordlist, words):
+    """Return the first line of a stats CSV file, recording the method
+    and the word list (by name and hash) the stats were computed with.
+    """
+    digest = hashlib.sha1("\n".join(words).encode("ascii")).hexdigest()[:16]
+    return f"# method={method.__name__} wordlist={wordlist} words={digest}"
+
+
+def get_finished_start_words(filename, checkpoint):
+    """Return the start words already recorded in a stats CSV file,
+    creating the file with the checkpoint line and a header if it
+    doesn't exist. A partly written last line from an interrupted run
+    is removed. A file written for a different checkpoint raises a
+    ValueError rather than being resumed.
+    """
+    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+        with open(filename, "w") as fileout:
+            fileout.write(f"{checkpoint}\nstart,average,max,failed\n")
+        return set()
+    with open(filename, "r+") as file:
+        data = file.read()
+        first = data.split("\n", 1)[0]
+        if first != checkpoint:
+            raise ValueError(
+                f"{filename} starts with {first!r}, not {checkpoint!r}. "
+                "Move it away to start a new sweep."
+            )
+        if not data.endswith("\n"):
+            data = data[: data.rfind("\n") + 1]
+            file.seek(0)
+            file.truncate()
+            file.write(data)
+    return {line.split(",")[0] for line in data.splitlines()[2:] if line}
+
+
+def solve_with_stats(wordlist, method=word_level_score, start_words=None, processes=1):
+    """Collect stats on solver for every start word.
+
+    Each finished start word is appended to the CSV file as one line in
+    a single write, and start words already in the file are skipped, so
+    an interrupted run can be resumed by calling this again. The file
+    records the method and word list, and a file written with others is
+    not resumed. Start words default to the solution list, but any word
+    list file can be given, e.g. start_words=valid_guesses. With
+    processes > 1 start words are spread across a pool of worker
+    processes.
+    """
 
     filename = f"start_word_stats_{method.__name__}.csv"
     words = get_words(wordlist)
-
-    with open(filename, "a") as fileout:
-        fileout.write("start,average,max,failed\n")
-
-    for ww in words:
-        score_list = []
-        all_results = {}
-        failed = 0
-        failed_list = []
-        for w in words:
-            sw = ww
-            score, result = solve(words, w, max_guesses=26, p=False, start_word=sw)
-            all_results[result] = score
-            if score is None or score > 6:
-                failed += 1
-                failed_list.append(result)
-            score_list.append(score)
-
-        avg = sum(score_list) / len(score_list)
-        print(f"Start word: {sw}")
-        print(f"Average: {avg}")
-        print(f"Max: {max(score_list)}")
-        print(f"Failed: {failed}")
-
-        with open(filename, "a") as fileout:
-            fileout.write(f"{sw},{avg},{max(score_list)},{failed}\n")
+    candidates = words if start_words is None else get_words(start_words)
+
+    finished = get_finished_start_words(
+        filename, checkpoint_line(method, wordlist, words)
+    )
+    todo = [w for w in candidates if w not in finished]
+    print(f"{len(finished)} start words done, {len(todo)} to go")
+
+    pool = None
+    if processes > 1:
+        pool = Pool(processes, initializer=_init_sweep_worker, initargs=(words, method))
+        results = pool.imap_unordered(_sweep_start_word, todo)
+    else:
+        _init_sweep_worker(words, method)
+        results = map(_sweep_start_word, todo)
+
+    fd = os.open(filename, os.O_WRONLY | os.O_APPEND)
+    try:
+        for sw, avg, max_score, failed in results:
+            print(f"Start word: {sw}")
+            print(f"Average: {avg}")
+            print(f"Max: {max_score}")
+            print(f"Failed: {failed}")
+            os.write(fd, f"{sw},{avg},{max_score},{failed}\n".encode())
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+        if pool is not None:
+            pool.terminate()
 
 
 if __name__ == "__main__":
@@ -508,6 +623,6 @@ if __name__ == "__main__":
     words = does_not_contain(words, "i")
 
     print("\nWord level suggestions:")
-    print_scores(word_level_score(words), num=30)
+    print_scores(word_level_score(words, k=30))
     print("\nLetter level suggestions:")
-    print_scores(position_level_score(words), num=30)
+    print_scores(position_level_score(words, k=30))
@@ -0,0 +1,244 @@
+"""A bitset index over a word list.
+
+Each word in the list gets an ID (its position in the list) and sets of
+words are stored as Python ints with bit i set when word i is in the
+set. The index keeps one bitset per letter and one per (letter,
+position), so every Wordle constraint is a single AND / AND NOT over
+the candidate bitset instead of a pass over a list of strings.
+"""
+import string
+
+from constraint import Constraint
+from word_table import get_words
+
+LETTERS = string.ascii_lowercase
+NUM_SLOTS = 26 + 26 * 5
+
+
+def _bits_from_ids(ids, size):
+    """Return a bitset with the given word IDs set."""
+    data = bytearray((size + 7) // 8)
+    for i in ids:
+        data[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(data, "little")
+
+
+class WordIndex:
+    """Per-letter and per-(letter, position) bitsets over a word list.
+
+    Positions are 1-based to match contains_at_position and friends.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.ids = {w: i for i, w in enumerate(self.words)}
+        self.all = (1 << len(self.words)) - 1
+
+        letter_ids = {c: [] for c in LETTERS}
+        position_ids = [{c: [] for c in LETTERS} for _ in range(5)]
+        count_ids = {c: [[] for _ in range(6)] for c in LETTERS}
+        for i, word in enumerate(self.words):
+            for char in set(word):
+                letter_ids[char].append(i)
+                for n in range(1, word.count(char) + 1):
+                    count_ids[char][n].append(i)
+            for p, char in enumerate(word):
+                position_ids[p][char].append(i)
+        size = len(self.words)
+        # Count slots used by CandidateState: one per letter followed by
+        # one per (letter, position), and the slots each word adds to.
+        self.word_slots = [
+            tuple(LETTERS.index(c) for c in set(word))
+            + tuple(26 + 5 * LETTERS.index(c) + p for p, c in enumerate(word))
+            for word in self.words
+        ]
+        self.slot_counts = [0] * NUM_SLOTS
+        for slots in self.word_slots:
+            for slot in slots:
+                self.slot_counts[slot] += 1
+        self.letter_bits = {c: _bits_from_ids(v, size) for c, v in letter_ids.items()}
+        self.position_bits = [
+            {c: _bits_from_ids(v, size) for c, v in ids.items()} for ids in position_ids
+        ]
+        # count_bits[c][n] holds the words with at least n of letter c.
+        self.count_bits = {
+            c: [self.all] + [_bits_from_ids(v, size) for v in ids[1:]]
+            for c, ids in count_ids.items()
+        }
+
+    def bits(self, words):
+        """Return the bitset for a list of words in the index."""
+        return _bits_from_ids((self.ids[w] for w in words), len(self.words))
+
+    def ids_in(self, bits):
+        """Return the list of word IDs in the bitset, in order."""
+        flags = bin(bits)[:1:-1]
+        result = []
+        i = flags.find("1")
+        while i != -1:
+            result.append(i)
+            i = flags.find("1", i + 1)
+        return result
+
+    def words_in(self, bits):
+        """Return the list of words in the bitset, in list order."""
+        words = self.words
+        return [words[i] for i in self.ids_in(bits)]
+
+    @staticmethod
+    def count(bits):
+        """Return the number of words in the bitset."""
+        return bin(bits).count("1")
+
+    def contains(self, bits, letter):
+        """Return the words in bits that contain the letter."""
+        return bits & self.letter_bits[letter]
+
+    def does_not_contain(self, bits, letter):
+        """Return the words in bits that don't contain the letter. This
+        corresponds to a grey guess in Wordle.
+        """
+        return bits & ~self.letter_bits[letter]
+
+    def does_not_contain_at_position(self, bits, letter, position):
+        """Return the words in bits that don't have the letter at the
+        position. This corresponds to a repeated letter that was marked
+        grey but does exist elsewhere in the word.
+        """
+        return bits & ~self.position_bits[position - 1][letter]
+
+    def contains_at_position(self, bits, letter, position):
+        """Return the words in bits that have the letter at the position.
+        This corresponds to a green guess in Wordle.
+        """
+        return bits & self.position_bits[position - 1][letter]
+
+    def contains_not_at_position(self, bits, letter, position):
+        """Return the words in bits that have the letter, but not at the
+        position. These correspond to yellow guesses in Wordle.
+        """
+        return (
+            bits & self.letter_bits[letter] & ~self.position_bits[position - 1][letter]
+        )
+
+    def reduce(self, wordscore, bits):
+        """Reduce the candidate bitset to the words consistent with the
+        provided wordscore, the same as reduce_solutions.
+        """
+        return Constraint(wordscore).apply(self, bits)
+
+
+class CandidateState:
+    """The remaining candidates of a game, as a bitset over a WordIndex,
+    along with running counts of how many candidates contain each letter
+    and each (letter, position).
+
+    The counts are taken the first time they are needed. After that,
+    when a guess is applied they are updated from whichever is smaller,
+    the words removed or the words left, so the per-turn cost never
+    exceeds the number of words eliminated. The state iterates and
+    has a length like a list of the remaining words, so it can be passed
+    straight to the scoring methods.
+    """
+
+    def __init__(self, index, bits=None):
+        self.index = index
+        if bits is None:
+            self.bits = index.all
+            self.words = index.words
+            self.counts = list(index.slot_counts)
+        else:
+            self.bits = bits
+            self.words = index.words_in(bits)
+            self.counts = None
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def copy(self):
+        """Return an independent copy of the state."""
+        state = CandidateState.__new__(CandidateState)
+        state.index = self.index
+        state.bits = self.bits
+        state.words = self.words
+        state.counts = None if self.counts is None else list(self.counts)
+        return state
+
+    def _recount(self, ids):
+        """Count the letters of the given words from scratch."""
+        self.counts = [0] * NUM_SLOTS
+        self._update_counts(ids, 1)
+
+    def _update_counts(self, ids, step):
+        counts = self.counts
+        word_slots = self.index.word_slots
+        for i in ids:
+            for slot in word_slots[i]:
+                counts[slot] += step
+
+    def reduce(self, wordscore):
+        """Remove the candidates ruled out by the wordscore."""
+        index = self.index
+        bits = index.reduce(wordscore, self.bits)
+        removed = self.bits & ~bits
+        kept = index.ids_in(bits)
+        self.bits = bits
+        self.words = [index.words[i] for i in kept]
+        if self.counts is None:
+            return
+        if index.count(removed) < len(kept):
+            self._update_counts(index.ids_in(removed), -1)
+        else:
+            self._recount(kept)
+
+    def get_counts(self):
+        """Return the list of letter and (letter, position) counts."""
+        if self.counts is None:
+            self._recount(self.index.ids_in(self.bits))
+        return self.counts
+
+    @property
+    def letter_counts(self):
+        """Return the number of candidates containing each letter."""
+        return dict(zip(LETTERS, self.get_counts()[:26]))
+
+    @property
+    def position_counts(self):
+        """Return the number of candidates with each letter at each
+        position.
+        """
+        counts = self.get_counts()
+        return {c: counts[26 + 5 * j : 31 + 5 * j] for j, c in enumerate(LETTERS)}
+
+    def letter_scores(self):
+        """Return the fraction of candidates containing each letter, as
+        get_letter_scores does.
+        """
+        n = len(self.words)
+        return {c: count / n for c, count in zip(LETTERS, self.get_counts()[:26])}
+
+    def letter_scores_by_position(self):
+        """Return the fraction of candidates with each letter at each
+        position, as get_letter_scores_by_position does.
+        """
+        n = len(self.words)
+        counts = self.get_counts()
+        return {
+            c: [count / n for count in counts[26 + 5 * j : 31 + 5 * j]]
+            for j, c in enumerate(LETTERS)
+        }
+
+
+_indexes = {}
+
+
+def get_word_index(filename):
+    """Return the WordIndex for a word file, building it only once per
+    process.
+    """
+    if filename not in _indexes:
+        _indexes[filename] = WordIndex(get_words(filename))
+    return _indexes[filename]
@@ -0,0 +1,124 @@
+"""NumPy array-backed word tables.
+
+A WordTable stores a word list as an N x 5 uint8 array of letter
+numbers (a=0 ... z=25) and a 26-bit mask per word with bit j set when
+the word contains letter j. The scoring kernels work on these arrays
+instead of looping over strings character by character.
+"""
+import string
+
+import numpy as np
+
+LETTERS = string.ascii_lowercase
+
+
+def words_to_array(words):
+    """Return the words as an N x 5 array of letter numbers (a=0)."""
+    data = "".join(words).encode("ascii")
+    return (np.frombuffer(data, dtype=np.uint8) - ord("a")).reshape(-1, 5)
+
+
+def letter_masks(letters):
+    """Return the 26-bit letter presence mask of each row of letters."""
+    bits = np.left_shift(np.uint32(1), letters.astype(np.uint32))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def top_indices(scores, k=None):
+    """Return the indices of the k highest scores, highest first, or of
+    all of them when k is None. Equal scores keep their list order, so
+    the result is always the first k of a full stable sort.
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    threshold = np.partition(scores, n - k)[n - k]
+    candidates = np.flatnonzero(scores >= threshold)
+    return candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+
+
+class WordTable:
+    """A word list stored as arrays of letters and letter masks."""
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.letters = words_to_array(self.words)
+        self.masks = letter_masks(self.letters)
+
+    def __len__(self):
+        return len(self.words)
+
+    def presence(self):
+        """Return an N x 26 boolean array of which letters each word
+        contains.
+        """
+        return (self.masks[:, None] >> np.arange(26, dtype=np.uint32)) & 1 == 1
+
+    def letter_counts(self):
+        """Return the number of words containing each letter."""
+        return self.presence().sum(axis=0)
+
+    def position_counts(self):
+        """Return a 26 x 5 array with the number of words that have each
+        letter at each position.
+        """
+        counts = np.zeros((26, 5), dtype=np.int64)
+        for i in range(5):
+            counts[:, i] = np.bincount(self.letters[:, i], minlength=26)
+        return counts
+
+    def word_level_scores(self, letter_scores):
+        """Return each word's sum of the scores of the letters it
+        contains. Each distinct letter is added once, in alphabetical
+        order, the same as the loop in word_level_score, so the floats
+        match exactly.
+        """
+        letters = np.sort(self.letters, axis=1)
+        repeated = np.zeros(letters.shape, dtype=bool)
+        repeated[:, 1:] = letters[:, 1:] == letters[:, :-1]
+        values = np.where(repeated, 0.0, np.asarray(letter_scores)[letters])
+        scores = np.zeros(len(self.words))
+        for i in range(5):
+            scores += values[:, i]
+        return scores
+
+    def position_level_scores(self, position_scores):
+        """Return each word's sum of the 26 x 5 position scores of its
+        letters, added in position order like position_level_score.
+        """
+        scores = np.zeros(len(self.words))
+        for i in range(5):
+            scores += position_scores[self.letters[:, i], i]
+        return scores
+
+    def ranked(self, scores, k=None):
+        """Return a word -> score dict of the k highest scores (all of
+        them when k is None) sorted highest first. Equal scores keep
+        their list order, the same as sort_dict.
+        """
+        order = top_indices(scores, k)
+        words = self.words
+        return {words[i]: s for i, s in zip(order.tolist(), scores[order].tolist())}
+
+
+def get_words(filename):
+    """Return a list of all the words in the file."""
+    result = []
+    with open(filename) as file:
+        for line in file:
+            result.append(line.rstrip())
+    return result
+
+
+_tables = {}
+
+
+def get_word_table(filename):
+    """Return the WordTable for a word file, loading it only once per
+    process.
+    """
+    if filename not in _tables:
+        _tables[filename] = WordTable(get_words(filename))
+    return _tables[filename]
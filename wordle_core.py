@@ -0,0 +1,808 @@
+"""The headless game and solver logic for py-wordle.
+
+This module has no GUI dependencies and reads the word lists on first
+use, so batch workers and database integrations can import it cheaply.
+The PySimpleGUI front end lives in wordle_game.py.
+"""
+import random
+import string
+
+import numpy as np
+
+from constraint import Constraint
+from patterns import decode_pattern, expected_information, get_pattern_matrix
+from word_index import CandidateState, get_word_index
+from word_table import (
+    WordTable,
+    get_word_table,
+    get_words,
+    top_indices,
+    words_to_array,
+)
+
+
+def sort_dict(d, reverse=True):
+    """Return the dictionary sorted by value."""
+    return dict(sorted(d.items(), key=lambda item: item[1], reverse=reverse))
+
+
+def contains(wordlist, letter):
+    """Return a list of words that contain the correct letter."""
+    result = []
+    for word in wordlist:
+        if letter in word:
+            result.append(word)
+    return result
+
+
+def does_not_contain(wordlist, letter):
+    """Return the words in wordlist that don't contain the specified
+    letter. This corresponds to a grey guess in Wordle.
+    """
+    result = []
+    for word in wordlist:
+        if letter not in word:
+            result.append(word)
+    return result
+
+
+def does_not_contain_at_position(wordlist, letter, position):
+    """Return the words in wordlist that don't contain the specified
+    letter at the specified position. This corresponds to a repeated
+    letter that was marked grey but does exist elsewhere in the word.
+    """
+    result = []
+    for word in wordlist:
+        if letter != word[position - 1]:
+            result.append(word)
+    return result
+
+
+def contains_at_position(wordlist, letter, position):
+    """Return the words that have the letter at the specified position.
+    This corresponds to a green guess in Wordle.
+    """
+    result = []
+    for word in wordlist:
+        if word[position - 1] == letter:
+            result.append(word)
+    return result
+
+
+def contains_not_at_position(wordlist, letter, position):
+    """Return the words that have the letter, but not at the specified
+    position. These correspond to yellow guesses in wordle.
+    """
+    result = []
+    wordlist = contains(wordlist, letter)
+    for word in wordlist:
+        if word[position - 1] != letter:
+            result.append(word)
+    return result
+
+
+def get_letter_scores(wordlist):
+    """Return a normalized percent count of each letter. The result is
+    what percent of the words in the wordlist contain at least one of
+    the letter.
+    """
+    if isinstance(wordlist, CandidateState):
+        return wordlist.letter_scores()
+    counts = WordTable(wordlist).letter_counts().tolist()
+    return {c: n / len(wordlist) for c, n in zip(string.ascii_lowercase, counts)}
+
+
+def get_letter_scores_by_position(wordlist):
+    """Return a normalized percent count of each letter. The result is
+    what percent of the words in the wordlist contain at least one of
+    the letter, separated into positions.
+
+    e.g. : a [0.061, 0.131, 0.133, 0.070, 0.028] means the char 'a'
+    occurs in the first position 6.1% of the time, in the second
+    position 13.1% of the time, etc.
+    """
+    if isinstance(wordlist, CandidateState):
+        return wordlist.letter_scores_by_position()
+    counts = WordTable(wordlist).position_counts().tolist()
+    return {
+        char: [n / len(wordlist) for n in counts[j]]
+        for j, char in enumerate(string.ascii_lowercase)
+    }
+
+
+def position_level_score(wordlist, k=1):
+    """Calculate a score for each word, using scores that are aware of
+    positions. Returns the k best words, or all of them sorted when k
+    is None.
+    """
+    char_frequency = get_letter_scores_by_position(wordlist)
+    table = WordTable(wordlist)
+    scores = table.position_level_scores(np.array(list(char_frequency.values())))
+    return table.ranked(scores, k)
+
+
+def word_level_score(wordlist, k=1):
+    """Give a score to each word. Each letter adds the % chance it has
+    of occuring in a word to the score for the whole word. Returns the
+    k best words, or all of them sorted when k is None.
+    """
+    scores = get_letter_scores(wordlist)
+    table = WordTable(wordlist)
+    return table.ranked(table.word_level_scores(np.array(list(scores.values()))), k)
+
+
+def entropy_score(wordlist, k=1):
+    """Give each word a score equal to the expected information (in
+    bits) of the feedback pattern it would get, if the solution is
+    any of the words in the wordlist with equal chance. Words that
+    split the list into many small groups score higher. Returns the k
+    best words, or all of them sorted when k is None.
+    """
+    if not wordlist:
+        raise ZeroDivisionError("Cannot score an empty wordlist")
+    words = list(wordlist)
+    scores = expected_information(get_pattern_matrix().bucket_counts(words, words))
+    order = top_indices(scores, k)
+    return {words[i]: v for i, v in zip(order.tolist(), scores[order].tolist())}
+
+
+def full_entropy_score(wordlist, k=1, guesses=None):
+    """Give the k best words from the full list of valid guesses (or
+    from guesses, if given) a score equal to the expected information
+    of their feedback against the wordlist. A word that can't be the
+    solution is often the best way to split the remaining words. Equal
+    scores prefer words in the wordlist, since those might also win
+    outright.
+    """
+    if not wordlist:
+        raise ZeroDivisionError("Cannot score an empty wordlist")
+    patterns = get_pattern_matrix()
+    scores = patterns.information(wordlist, guesses)
+    if guesses is None:
+        guesses = patterns.guesses
+        candidate = np.zeros(len(scores), dtype=bool)
+        candidate[[patterns.guess_index[w] for w in wordlist]] = True
+    else:
+        wanted = set(wordlist)
+        candidate = np.fromiter((w in wanted for w in guesses), bool, len(guesses))
+    # Round away summation-order noise so that ties are real ties.
+    order = top_indices(np.round(scores, 9) + 1e-10 * candidate, k)
+    return {guesses[i]: v for i, v in zip(order.tolist(), scores[order].tolist())}
+
+
+def sampled_entropy_score(
+    wordlist,
+    k=1,
+    guesses=None,
+    sample_size=256,
+    exact_below=512,
+    max_refine=64,
+    intervals=False,
+):
+    """Approximate full_entropy_score by estimating the information of
+    each guess from a sample of sample_size words of the wordlist, drawn
+    with a fixed seed (see PatternMatrix.sampled_information). Once no
+    more than exact_below words are left, the words are scored exactly.
+
+    The guesses whose 95% confidence interval reaches the highest lower
+    end of any interval (at most max_refine of them, best estimate
+    first) are then scored exactly against the whole wordlist and ranked
+    first, so the top scores are exact. Any others are ranked by their
+    estimate.
+
+    With intervals=True each score is a (score, half_width) pair
+    instead, where the score's 95% confidence interval is score +/-
+    half_width. Exact scores have a half width of 0.
+    """
+    if not wordlist:
+        raise ZeroDivisionError("Cannot score an empty wordlist")
+    if len(wordlist) <= exact_below:
+        result = full_entropy_score(wordlist, k, guesses)
+        if intervals:
+            return {w: (v, 0.0) for w, v in result.items()}
+        return result
+    patterns = get_pattern_matrix()
+    estimate, half_width = patterns.sampled_information(
+        wordlist, sample_size, guesses=guesses
+    )
+    if guesses is None:
+        guesses = patterns.guesses
+    best = np.max(estimate - half_width)
+    shortlist = np.flatnonzero(estimate + half_width >= best)
+    shortlist = shortlist[top_indices(estimate[shortlist], max_refine)]
+    exact = full_entropy_score(
+        wordlist, k=k, guesses=[guesses[i] for i in shortlist.tolist()]
+    )
+    result = {w: (v, 0.0) for w, v in exact.items()}
+    if k is None or len(result) < k:
+        for i in top_indices(estimate).tolist():
+            if k is not None and len(result) >= k:
+                break
+            result.setdefault(guesses[i], (estimate[i].item(), half_width[i].item()))
+    if intervals:
+        return result
+    return {w: v for w, (v, _) in result.items()}
+
+
+# Scoring methods that pick from the whole guess list rather than the
+# remaining solutions set guess_list = True and take a guesses argument.
+# In hard mode they are given the consistent guesses to choose from. The
+# other methods only suggest remaining solutions, which always satisfy
+# hard mode. Scores are higher-is-better unless a method sets
+# lower_is_better = True.
+full_entropy_score.guess_list = True
+sampled_entropy_score.guess_list = True
+
+
+def is_guess_list_method(method):
+    """Return True if the method scores the whole guess list."""
+    return getattr(method, "guess_list", False)
+
+
+def score_guesses(method, wordlist, guesses=None):
+    """Return the best word from method(wordlist), choosing only from
+    guesses with the methods that score the whole guess list.
+    """
+    if guesses is not None and is_guess_list_method(method):
+        return next(iter(method(wordlist, guesses=guesses)))
+    return next(iter(method(wordlist)))
+
+
+class SearchResult:
+    """The outcome of an anytime_search: the best guess found, its
+    score, and how many of the guesses were evaluated in time.
+
+    score is in the method's own units. It is better when higher, unless
+    lower_is_better is True (as for lookahead_score).
+    """
+
+    def __init__(self, guess, score, evaluated, total, elapsed, lower_is_better=False):
+        self.guess = guess
+        self.score = score
+        self.lower_is_better = lower_is_better
+        self.evaluated = evaluated
+        self.total = total
+        self.elapsed = elapsed
+
+    @property
+    def complete(self):
+        """True if every guess was evaluated."""
+        return self.evaluated == self.total
+
+    @property
+    def fraction(self):
+        """The fraction of the guesses that were evaluated."""
+        return self.evaluated / self.total if self.total else 1.0
+
+    def __repr__(self):
+        return (
+            f"SearchResult({self.guess!r}, score={self.score}, "
+            f"evaluated={self.evaluated}/{self.total}, elapsed={self.elapsed:.3f})"
+        )
+
+
+def warm_up(method):
+    """Load the shared tables a guess list method uses, and call the
+    method's own warm_up function if it has one, so that the one-time
+    setup isn't timed as part of an anytime_search.
+    """
+    get_pattern_matrix().solution_major()
+    get_word_table(WordleGame.guess_file)
+    get_word_index(WordleGame.guess_file)
+    if hasattr(method, "warm_up"):
+        method.warm_up()
+
+
+def anytime_search(method, wordlist, time_budget, guesses=None):
+    """Return a SearchResult with the best guess a guess list method
+    finds for the wordlist within about time_budget seconds.
+
+    The word_level_score pick is the answer to start with, with a score
+    of None. The valid guesses (or guesses, if given) are then ordered
+    by their word level score and evaluated in chunks, each along with
+    the best guess so far, until they run out or the budget does. The
+    first chunk is a single guess. Each later one is sized to fit in
+    half the time left at the slowest time per guess of any chunk so
+    far, and is at most twice the size of the one before. Ties keep the
+    guess found first.
+
+    Methods that set takes_deadline = True are given the deadline and
+    stop there, scoring only the guesses they finished, and the search
+    ends with those. Other methods always finish a chunk, so a slow
+    first guess or chunk can run past the budget.
+
+    The budget doesn't include loading the shared tables, see warm_up.
+    """
+    from timeit import default_timer as timer
+
+    if not wordlist:
+        raise ZeroDivisionError("Cannot score an empty wordlist")
+    if not is_guess_list_method(method):
+        raise ValueError(f"{method.__name__} can't be run with a time budget")
+    warm_up(method)
+    start = timer()
+    deadline = start + time_budget
+    letter_scores = np.array(list(get_letter_scores(wordlist).values()))
+    if guesses is None:
+        table = get_word_table(WordleGame.guess_file)
+    else:
+        table = WordTable(guesses)
+    order = top_indices(table.word_level_scores(letter_scores)).tolist()
+    best, score = next(iter(word_level_score(wordlist))), None
+    evaluated = 0
+    spent = 0.0
+    per_guess = 0.0
+    size = 1
+    while evaluated < len(order):
+        now = timer()
+        if now >= deadline:
+            break
+        if evaluated:
+            # Leave room for guesses that are slower than those so far.
+            per_guess = max(per_guess, spent / evaluated)
+            size = min(2 * size, int((deadline - now) / 2 / per_guess))
+            if size < 1:
+                break
+        chunk = [table.words[i] for i in order[evaluated : evaluated + size]]
+        candidates = [best] + [w for w in chunk if w != best]
+        if getattr(method, "takes_deadline", False):
+            scores = method(
+                wordlist, k=len(candidates), guesses=candidates, deadline=deadline
+            )
+        else:
+            scores = method(wordlist, k=len(candidates), guesses=candidates)
+        if scores:
+            best, score = next(iter(scores.items()))
+        elapsed = timer() - now
+        scored = sum(w in scores for w in chunk)
+        evaluated += scored
+        spent += elapsed
+        if scored < len(chunk):
+            # The method ran out of time part way through the chunk.
+            break
+        per_guess = max(per_guess, elapsed / len(chunk))
+    return SearchResult(
+        best,
+        score,
+        evaluated,
+        len(order),
+        timer() - start,
+        getattr(method, "lower_is_better", False),
+    )
+
+
+def reduce_solutions(wordscore, wordlist):
+    """Reduce the possible solutions to the words that would give the
+    provided wordscore, in a single pass over the list.
+    """
+    words = list(wordlist)
+    if not words:
+        return words
+    keep = Constraint(wordscore).mask(words_to_array(words))
+    return [w for w, k in zip(words, keep.tolist()) if k]
+
+
+class WordFile:
+    """A class attribute holding the words of a file that is only read
+    the first time it is used. The file name is read from the attribute
+    named by file_attr.
+    """
+
+    def __init__(self, file_attr):
+        self.file_attr = file_attr
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        words = get_words(getattr(owner, self.file_attr))
+        setattr(owner, self.name, words)
+        return words
+
+
+class WordleGame:
+    """A class representing a Wordle game."""
+
+    guess_file = "wordlist_guesses.txt"
+    solution_file = "wordlist_solutions.txt"
+    valid_guesses = WordFile("guess_file")
+    possible_solutions = WordFile("solution_file")
+    candidates = None
+    state = None
+    hard_mode = False
+    allowed = None
+    decision_tree = None
+    score_cache = None
+    last_search = None
+    guesses_made = []
+    solution = ""
+    solution_index = None
+    enable_solver = False
+    game_over = False
+    solved = False
+
+    def __init__(
+        self, guesses_made=None, enable_solver=True, solution=None, hard_mode=False
+    ):
+        """Set up guess list and pick a solution. In hard mode every
+        guess must use the green and yellow letters revealed so far.
+        """
+        if solution is None:
+            self.solution, self.solution_index = self.pick_solution()
+        else:
+            self.solution = solution
+            self.solution_index = self.possible_solutions.index(solution)
+        if guesses_made:
+            self.guesses_made = guesses_made
+        else:
+            self.guesses_made = []
+        if enable_solver:
+            self.enable_solver = True
+        self.state = CandidateState(get_word_index(self.solution_file))
+        self.candidates = self.state.bits
+        if hard_mode:
+            self.hard_mode = True
+            self.allowed = get_word_index(self.guess_file).all
+        # print(f"Solution is #{self.solution_index}:'{self.solution}'")
+
+    def pick_solution(self, n=None):
+        """Return the solution word, or a random solution if no index
+        was specified.
+        """
+        valid_solutions = get_words(self.solution_file)
+        if n is None:
+            n = random.randint(0, len(valid_solutions))
+        return valid_solutions[n], n
+
+    def is_valid_guess(self, word):
+        """Return True if the word is a valid guess, else False."""
+        index = get_word_index(self.guess_file)
+        i = index.ids.get(word)
+        if i is None:
+            return False
+        if self.hard_mode:
+            return bool(self.allowed >> i & 1)
+        return True
+
+    def consistent_guesses(self):
+        """Return the guesses allowed by hard mode, or all the valid
+        guesses in normal mode.
+        """
+        if not self.hard_mode:
+            return self.valid_guesses
+        return get_word_index(self.guess_file).words_in(self.allowed)
+
+    def is_solution(self, word):
+        """Return True if word is the solution, else return False."""
+        if word == self.solution:
+            return True
+        return False
+
+    def game_is_over(self):
+        """Return True if user has used all 6 guesses or the game was
+        previously determined to be over, else return False.
+        """
+        if len(self.guesses_made) >= 6 or self.game_over:
+            return True
+        return False
+
+    def set_game_over(self):
+        """Set the game over flag."""
+        self.game_over = True
+
+    def evaluate_guess(self, guess):
+        """Return a list representing how the guess matches the
+        solution. Each character in the guess gets a value:
+
+        0 - grey   - letter is not in the solution at any position
+        1 - yellow - letter is in the solution at a different position
+        2 - green  - letter is in the solution at the correct position
+        """
+        patterns = get_pattern_matrix(self.guess_file, self.solution_file)
+        code = patterns.pattern(guess, self.solution)
+        result = [[letter, v] for letter, v in zip(guess, decode_pattern(code))]
+        self.guesses_made.append(result)
+        if self.hard_mode:
+            index = get_word_index(self.guess_file)
+            self.allowed = Constraint.revealed(result).apply(index, self.allowed)
+        if self.enable_solver:
+            self.state.reduce(result)
+            self.candidates = self.state.bits
+            self.possible_solutions = self.state.words
+        if len(self.guesses_made) >= 6:
+            self.game_over = True
+        if guess == self.solution:
+            self.game_over = True
+            self.solved = True
+        return result
+
+    def suggest_word(self, wordlist=None, method=word_level_score, time_budget=None):
+        """Return the next word suggested by the chosen method. If a
+        decision tree for the method is loaded (see decision_tree.py)
+        and the game is still on it, the word is looked up instead.
+        Scores are memoised in the score_cache if one is set.
+
+        With a time_budget (in seconds), a method that scores the whole
+        guess list returns the best word it finds in about that time,
+        see anytime_search, and other methods raise a ValueError. The
+        SearchResult is kept in last_search, which is None after a call
+        without a time budget.
+        """
+        self.last_search = None
+        if time_budget is not None and not is_guess_list_method(method):
+            raise ValueError(f"{method.__name__} can't be run with a time budget")
+        if wordlist is None:
+            tree = self.decision_tree
+            if tree is not None and tree.method == method.__name__:
+                guess = tree.next_guess(self.guesses_made)
+                if guess is not None and (
+                    not self.hard_mode or self.is_valid_guess(guess)
+                ):
+                    return guess
+            wordlist = self.state
+        if time_budget is not None:
+            guesses = self.consistent_guesses() if self.hard_mode else None
+            self.last_search = anytime_search(method, wordlist, time_budget, guesses)
+            return self.last_search.guess
+        if self.hard_mode and is_guess_list_method(method):
+            return score_guesses(method, wordlist, self.consistent_guesses())
+        if self.score_cache is not None:
+            return next(iter(self.score_cache.score(method, wordlist)))
+        return next(iter(method(wordlist)))
+
+    def solve(self, method=word_level_score, first_guess="later", time_budget=None):
+        """Solve the game using the provided method. Returns the guess
+        list and scores, and whether or not the puzzle was solved.
+        time_budget limits the time per guess, as in suggest_word.
+
+        Providing a pre-computed first guess that partitions the
+        solution space well can greatly speed up solving. For example,
+        using the basic word level score function without a pre-selected
+        first guess takes 13.53 seconds to solve all possible puzzles.
+        Adding the first guess 'later' (which will always be the same
+        word, depending on the algorithm) sped the time up to 2.15
+        seconds, a 6.3x speedup.
+        """
+        while not self.game_is_over():
+            if first_guess is not None and len(self.guesses_made) == 0:
+                self.evaluate_guess(first_guess)
+                first_guess = None
+            else:
+                self.evaluate_guess(
+                    self.suggest_word(method=method, time_budget=time_budget)
+                )
+        return self.guesses_made, self.solved
+
+
+def _init_benchmark_worker():
+    """Load the word tables once in each benchmark worker process."""
+    get_pattern_matrix()
+    get_word_index(WordleGame.solution_file)
+    get_word_index(WordleGame.guess_file)
+
+
+def _benchmark_puzzle(solution, method=word_level_score, hard_mode=False):
+    """Solve one puzzle for run_solver_benchmarks. Returns the number of
+    guesses used, None if it wasn't solved, or 0 if the solver failed.
+    """
+    try:
+        game = WordleGame(enable_solver=True, solution=solution, hard_mode=hard_mode)
+        result, solved = game.solve(method=method)
+    except ZeroDivisionError:
+        print("Zero division! ", solution)
+        return 0
+    if not solved:
+        return None
+    return len(result)
+
+
+def run_solver_benchmarks(
+    method=word_level_score, processes=1, cache=None, hard_mode=False
+):
+    """Solve all possible puzzles and print some statistics.
+
+    With processes > 1 the puzzles are split across a pool of worker
+    processes, each of which loads the word tables once. The results
+    are merged in solution order, so they match a serial run.
+
+    Passing a ScoreCache memoises scores for repeated solver states
+    during the run. The cache set on WordleGame before is put back after.
+    """
+
+    from collections import Counter
+    from functools import partial
+    from multiprocessing import Pool
+    from timeit import default_timer as timer
+
+    all_solutions = get_words("wordlist_solutions.txt")
+    _init_benchmark_worker()
+    previous_cache = WordleGame.score_cache
+    WordleGame.score_cache = cache
+    solve_puzzle = partial(_benchmark_puzzle, method=method, hard_mode=hard_mode)
+    try:
+        start = timer()
+        if processes > 1:
+            chunksize = max(1, len(all_solutions) // (processes * 8))
+            with Pool(processes, initializer=_init_benchmark_worker) as pool:
+                scores = pool.map(solve_puzzle, all_solutions, chunksize=chunksize)
+        else:
+            scores = [solve_puzzle(w) for w in all_solutions]
+        end = timer()
+    finally:
+        WordleGame.score_cache = previous_cache
+    blacklist = [w for w, n in zip(all_solutions, scores) if n == 0]
+    unsolved = [w for w, n in zip(all_solutions, scores) if n is None]
+    num_guesses = [n for n in scores if n]
+    distribution = dict(sorted(Counter(num_guesses).items()))
+    print(f"Blacklist {len(blacklist)}: {blacklist}")
+    print(f"Unsolved {len(unsolved)}: {unsolved}")
+    print(f"Average score: {sum(num_guesses)/len(num_guesses)}")
+    print(f"Score distribution: {distribution}")
+    print(f"Elapsed time: {end - start}")
+    if cache is not None and processes == 1:
+        print(f"Score cache: {cache.stats()}")
+    return {
+        "blacklist": blacklist,
+        "unsolved": unsolved,
+        "distribution": distribution,
+        "elapsed time": end - start,
+    }
+
+
+def simulate_batch(
+    solutions=None,
+    method=word_level_score,
+    first_guess="later",
+    max_guesses=6,
+    hard_mode=False,
+):
+    """Solve many puzzles in lockstep, as WordleGame.solve would.
+
+    All target solutions start in one group. Each turn, every group of
+    games that share the same guesses and feedback so far (and so the
+    same candidates) is scored once, and the group is split by the
+    feedback its guess gets from each solution.
+
+    In hard mode each group also tracks the bitset of guesses that are
+    still allowed, which only depends on the shared history.
+
+    Returns a dict mapping each solution to its (guesses_made, solved)
+    trace, and a list of solutions whose scoring raised
+    ZeroDivisionError.
+    """
+    index = get_word_index(WordleGame.solution_file)
+    guess_index = get_word_index(WordleGame.guess_file) if hard_mode else None
+    patterns = get_pattern_matrix()
+    if solutions is None:
+        solutions = index.words
+    traces = {}
+    blacklist = []
+    allowed = guess_index.all if hard_mode else None
+    groups = [(CandidateState(index), [], list(solutions), allowed)]
+    for turn in range(max_guesses):
+        next_groups = []
+        for state, history, group, allowed in groups:
+            if turn == 0 and first_guess is not None:
+                guess = first_guess
+            else:
+                guesses = None
+                if hard_mode and is_guess_list_method(method):
+                    guesses = guess_index.words_in(allowed)
+                try:
+                    guess = score_guesses(method, state, guesses)
+                except ZeroDivisionError:
+                    blacklist.extend(group)
+                    continue
+            branches = {}
+            for solution in group:
+                branches.setdefault(patterns.pattern(guess, solution), []).append(
+                    solution
+                )
+            for code, branch in branches.items():
+                result = [[c, v] for c, v in zip(guess, decode_pattern(code))]
+                guesses_made = history + [result]
+                if guess in branch:
+                    traces[guess] = (guesses_made, True)
+                    branch = [w for w in branch if w != guess]
+                if not branch:
+                    continue
+                if turn == max_guesses - 1:
+                    for solution in branch:
+                        traces[solution] = (guesses_made, False)
+                    continue
+                child = state.copy()
+                child.reduce(result)
+                child_allowed = allowed
+                if hard_mode:
+                    child_allowed = Constraint.revealed(result).apply(
+                        guess_index, allowed
+                    )
+                next_groups.append((child, guesses_made, branch, child_allowed))
+        groups = next_groups
+    return {w: traces[w] for w in solutions if w in traces}, blacklist
+
+
+def run_batch_benchmarks(method=word_level_score, first_guess="later", hard_mode=False):
+    """Solve all possible puzzles with simulate_batch and print the same
+    statistics as run_solver_benchmarks.
+    """
+
+    from collections import Counter
+    from timeit import default_timer as timer
+
+    start = timer()
+    traces, blacklist = simulate_batch(
+        method=method, first_guess=first_guess, hard_mode=hard_mode
+    )
+    end = timer()
+    unsolved = [w for w, (_, solved) in traces.items() if not solved]
+    num_guesses = [len(guesses) for guesses, solved in traces.values() if solved]
+    distribution = dict(sorted(Counter(num_guesses).items()))
+    print(f"Blacklist {len(blacklist)}: {blacklist}")
+    print(f"Unsolved {len(unsolved)}: {unsolved}")
+    print(f"Average score: {sum(num_guesses)/len(num_guesses)}")
+    print(f"Score distribution: {distribution}")
+    print(f"Elapsed time: {end - start}")
+    return {
+        "blacklist": blacklist,
+        "unsolved": unsolved,
+        "distribution": distribution,
+        "elapsed time": end - start,
+    }
+
+
+def measure_startup_latency(module="wordle_core"):
+    """Print how long a fresh interpreter takes to import the module and
+    then to solve its first puzzle, which includes loading the word
+    tables.
+    """
+    import subprocess
+    import sys
+
+    code = (
+        "from timeit import default_timer as timer\n"
+        "start = timer()\n"
+        f"import {module}\n"
+        "imported = timer()\n"
+        f"{module}.WordleGame(enable_solver=True, solution='cigar').solve()\n"
+        "print(imported - start, timer() - imported)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    import_time, solve_time = (float(t) for t in result.stdout.split())
+    print(f"Import {module}: {import_time:.3f}s")
+    print(f"First solve: {solve_time:.3f}s")
+    return import_time, solve_time
+
+
+def make_score(word, score):
+    """Return a wordscore list from two strings that can be used by the
+    solver's reduce function.
+
+    e.g. word='later' and score='21011' would give
+        [['l', 2], ['a', 1], ['t', 0], ['e', 1], ['r', 1]]
+    """
+    return [[l, int(s)] for l, s in zip(word, score)]
+
+
+def manual_solver(guesses):
+    """Use this to solve Wordle games in progress."""
+
+    def print_scores(score_dict, num=15000):
+        """Print out the scores in the order given, which is highest
+        first for the scoring methods.
+        """
+        print(f"Count: {len(score_dict)}")
+        for i, (k, v) in enumerate(score_dict.items()):
+            if i < num:
+                print(k, v)
+
+    words = get_words("wordlist_solutions.txt")
+    for guess in guesses:
+        words = reduce_solutions(make_score(guess[0], guess[1]), words)
+    print("Word level suggestions:")
+    print_scores(word_level_score(words, k=5))
+    print("Suggestions from the full guess list:")
+    print_scores(full_entropy_score(words, k=5))
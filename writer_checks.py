@@ -0,0 +1,182 @@
+"""Check the database result writers without a database server.
+
+The Cassandra writer is run against StandInSession, which has the
+execute, execute_async and prepare methods of a cassandra-driver
+session and records every statement it is given. Run this file to
+check the writes each writer sends.
+
+The MongoDB writer is run against an in-memory mongomock collection,
+so that check needs mongomock installed.
+"""
+from cassandra_db_integration import (
+    SUMMARY_FIELDS,
+    SUMMARY_TABLE,
+    Cassandra,
+)
+from cassandra_db_integration import average_score as cassandra_average
+from cassandra_db_integration import failed_solutions as cassandra_failed
+from cassandra_db_integration import score_distribution as cassandra_distribution
+from mongo_db_integration import (
+    BufferedWriter,
+    average_score,
+    failed_solutions,
+    score_distribution,
+)
+
+
+class StandInFuture:
+    """The result of StandInSession.execute_async."""
+
+    def __init__(self, session):
+        self.session = session
+        self.done = False
+
+    def result(self):
+        """Mark the request as finished."""
+        if not self.done:
+            self.done = True
+            self.session.in_flight -= 1
+        return []
+
+
+class StandInRows(list):
+    """The rows returned by StandInSession.execute."""
+
+    def one(self):
+        """Return the first row, or None if there are none."""
+        return self[0] if self else None
+
+
+class StandInSession:
+    """A stand-in for a Cassandra session that records the statements it
+    runs and the most requests that were in flight at once. Rows written
+    to the summary table are kept, so the reports can read them back.
+    """
+
+    def __init__(self):
+        self.prepared = []
+        self.executed = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.summaries = {}
+
+    def prepare(self, command):
+        """Return the command itself as the prepared statement."""
+        self.prepared.append(command)
+        return command
+
+    def execute(self, statement, parameters=None):
+        """Record the statement and return the rows it selects from the
+        summary table, if any.
+        """
+        self.executed.append((statement, parameters))
+        if statement.startswith(f"INSERT INTO {SUMMARY_TABLE} "):
+            self.summaries[parameters[0]] = dict(zip(SUMMARY_FIELDS, parameters))
+        elif statement.startswith(f"DELETE FROM {SUMMARY_TABLE} "):
+            self.summaries.pop(parameters[0], None)
+        elif f"FROM {SUMMARY_TABLE} " in statement:
+            row = self.summaries.get(parameters[0])
+            return StandInRows([] if row is None else [row])
+        return StandInRows()
+
+    def execute_async(self, statement, parameters=None):
+        """Record the statement and return a StandInFuture."""
+        self.executed.append((statement, parameters))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return StandInFuture(self)
+
+
+def sample_rows(n=100):
+    """Return n result rows, with every tenth puzzle unsolved."""
+    return [
+        {"solution": f"w{i:04}", "score": 3 + i % 4, "solved": i % 10 != 0}
+        for i in range(n)
+    ]
+
+
+def check_cassandra_writer():
+    """Check that insert_many writes every row with one prepared
+    statement and bounded concurrency, and that insert_results writes
+    the same summary row however often it is run.
+    """
+    session = StandInSession()
+    db = Cassandra(session=session, verbose=False, concurrency=8)
+    rows = sample_rows()
+
+    db.insert_many("word_level_score", rows)
+    insert = "INSERT INTO word_level_score (solution, score, solved) VALUES (?, ?, ?)"
+    assert session.prepared == [insert]
+    assert session.executed == [(insert, tuple(r.values())) for r in rows]
+    assert session.max_in_flight == 8
+    assert session.in_flight == 0
+
+    solved = [r for r in rows if r["solved"]]
+    for _ in range(2):
+        # Writing the same results again must give the same summary.
+        db.insert_results("word_level_score", rows)
+        summary = session.summaries["word_level_score"]
+        assert summary["games"] == len(solved)
+        assert summary["score_sum"] == sum(r["score"] for r in solved)
+    assert cassandra_average(db, "word_level_score") == summary["score_sum"] / len(
+        solved
+    )
+    distribution = cassandra_distribution(db, "word_level_score")
+    assert list(distribution) == [3, 4, 5, 6]
+    for score in range(3, 7):
+        assert distribution[score] == sum(r["score"] == score for r in solved)
+    failed = [r["solution"] for r in rows if not r["solved"]]
+    assert cassandra_failed(db, "word_level_score") == failed
+    assert session.in_flight == 0
+
+    db.clear_summary("word_level_score")
+    assert cassandra_average(db, "word_level_score") is None
+    assert cassandra_distribution(db, "word_level_score") == {}
+    assert cassandra_failed(db, "word_level_score") == []
+    print("Cassandra writer: OK")
+
+
+class CountingCollection:
+    """Wraps a collection to record the size of each insert_many batch."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.batches = []
+
+    def insert_many(self, documents, ordered=True):
+        """Record the batch and pass it on."""
+        assert not ordered
+        self.batches.append(len(documents))
+        return self.collection.insert_many(documents, ordered=ordered)
+
+
+def check_mongo_writer():
+    """Check that BufferedWriter writes every document in batches of
+    batch_size, and that the report pipelines count them correctly.
+    """
+    import mongomock
+
+    collection = mongomock.MongoClient()["wordle"]["word_level_score"]
+    counting = CountingCollection(collection)
+    rows = sample_rows()
+    with BufferedWriter(counting, batch_size=30) as writer:
+        for r in rows:
+            writer.insert(dict(r))
+    assert counting.batches == [30, 30, 30, 10]
+    assert writer.written == len(rows)
+    assert collection.count_documents({}) == len(rows)
+
+    solved = [r for r in rows if r["solved"]]
+    assert average_score(collection) == sum(r["score"] for r in solved) / len(solved)
+    distribution = score_distribution(collection)
+    for score in range(3, 7):
+        assert distribution[score] == sum(r["score"] == score for r in solved)
+    assert sorted(failed_solutions(collection)) == [
+        r["solution"] for r in rows if not r["solved"]
+    ]
+    print("MongoDB writer: OK")
+
+
+if __name__ == "__main__":
+    check_cassandra_writer()
+    check_mongo_writer()